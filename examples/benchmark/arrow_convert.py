@@ -0,0 +1,106 @@
+"""
+Benchmark of converting bar data for analysis: DataFrame built by looping
+over objects vs Arrow table from object list and from bar batch.
+
+Usage:
+    python arrow_convert.py [bar_count]
+"""
+
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Callable, List, Tuple
+
+import pandas as pd
+
+from vnpy.trader.arrow import bars_to_arrow, batch_to_arrow, arrow_to_bars, to_numpy_columns
+from vnpy.trader.batch import BarBatch
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData
+from vnpy.trader.utility import ZoneInfo
+
+
+ROUNDS: int = 5
+
+START: datetime = datetime(2024, 1, 2, 9, 30, tzinfo=ZoneInfo("Asia/Shanghai"))
+
+
+def create_bars(count: int) -> List[BarData]:
+    """"""
+    return [
+        BarData(
+            symbol="IF2401",
+            exchange=Exchange.CFFEX,
+            datetime=START + timedelta(minutes=i),
+            interval=Interval.MINUTE,
+            volume=i,
+            turnover=i * 3500.0,
+            open_interest=200000,
+            open_price=3500 + i * 0.2,
+            high_price=3510 + i * 0.2,
+            low_price=3490 + i * 0.2,
+            close_price=3505 + i * 0.2,
+            gateway_name="DB"
+        )
+        for i in range(count)
+    ]
+
+
+def loop_to_dataframe(bars: List[BarData]) -> pd.DataFrame:
+    """
+    The usual way of building DataFrame row by row from objects.
+    """
+    return pd.DataFrame([
+        {
+            "datetime": bar.datetime,
+            "open": bar.open_price,
+            "high": bar.high_price,
+            "low": bar.low_price,
+            "close": bar.close_price,
+            "volume": bar.volume,
+            "turnover": bar.turnover,
+            "open_interest": bar.open_interest,
+        }
+        for bar in bars
+    ])
+
+
+def measure(func: Callable, arg: object) -> float:
+    """
+    Return milliseconds per call, best of several rounds.
+    """
+    best: float = float("inf")
+
+    for _ in range(ROUNDS):
+        start: float = perf_counter()
+        func(arg)
+        best = min(best, perf_counter() - start)
+
+    return best * 1000
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        count: int = int(sys.argv[1])
+    else:
+        count: int = 200_000
+
+    bars: List[BarData] = create_bars(count)
+    batch: BarBatch = BarBatch.from_bars(bars)
+    table = batch_to_arrow(batch)
+
+    cases: List[Tuple[str, Callable, object]] = [
+        ("objects -> DataFrame (loop)", loop_to_dataframe, bars),
+        ("objects -> Arrow", bars_to_arrow, bars),
+        ("objects -> Arrow -> DataFrame", lambda bars: bars_to_arrow(bars).to_pandas(), bars),
+        ("batch -> Arrow", batch_to_arrow, batch),
+        ("batch -> Arrow -> DataFrame", lambda batch: batch_to_arrow(batch).to_pandas(), batch),
+        ("Arrow -> NumPy columns", to_numpy_columns, table),
+        ("Arrow -> objects", arrow_to_bars, table),
+    ]
+
+    print(f"bars: {count}")
+    print(f"{'case':<34}{'ms':>10}")
+
+    for name, func, arg in cases:
+        print(f"{name:<34}{measure(func, arg):>10.2f}")
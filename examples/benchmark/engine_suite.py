@@ -0,0 +1,391 @@
+"""
+Benchmark suite of the event hot path: EventEngine driving LogEngine and
+OmsEngine of MainEngine, with synthetic tick, order, trade and log data
+pushed through a dummy gateway at configurable rate and symbol count.
+
+Each data pushed counts as one event, though gateway puts both the
+general event (e.g. eTick.) and the specific one (e.g. eTick.vt_symbol).
+Reports throughput, latency percentiles (from gateway callback to the end
+of processing by all handlers of the event type), CPU time and RSS, and
+writes results into JSON file for comparing between releases.
+
+Only standard library is required besides vnpy itself (Linux/macOS).
+
+Usage:
+    python engine_suite.py --symbols 100 --count 200000 --rate 0 --output result.json
+"""
+
+import json
+import platform
+import resource
+import sys
+from argparse import ArgumentParser, Namespace
+from datetime import datetime
+from random import Random
+from threading import Event as Signal
+from time import perf_counter, sleep
+from typing import Any, Dict, List
+
+import vnpy
+from vnpy.event import Event, EventEngine
+from vnpy.trader.constant import Direction, Exchange, Offset, Product, Status
+from vnpy.trader.engine import MainEngine
+from vnpy.trader.event import EVENT_LOG, EVENT_ORDER, EVENT_TICK, EVENT_TRADE
+from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.object import ContractData, LogData, OrderData, TickData, TradeData
+from vnpy.trader.setting import SETTINGS
+
+
+MEASURED_TYPES: List[str] = [EVENT_TICK, EVENT_ORDER, EVENT_TRADE, EVENT_LOG]
+PERCENTILES: List[float] = [50, 90, 99, 99.9]
+PACE_STEPS: int = 100               # steps put between checks of pacing
+
+
+class BenchmarkGateway(BaseGateway):
+    """
+    Gateway without any connection, only used for pushing data.
+    """
+
+    default_name: str = "BENCHMARK"
+
+    exchanges: List[Exchange] = [Exchange.LOCAL]
+
+    def connect(self, setting: dict) -> None:
+        """"""
+        pass
+
+    def close(self) -> None:
+        """"""
+        pass
+
+    def subscribe(self, req: Any) -> None:
+        """"""
+        pass
+
+    def send_order(self, req: Any) -> str:
+        """"""
+        return ""
+
+    def cancel_order(self, req: Any) -> None:
+        """"""
+        pass
+
+    def query_account(self) -> None:
+        """"""
+        pass
+
+    def query_position(self) -> None:
+        """"""
+        pass
+
+
+class LatencyRecorder:
+    """
+    Records latency of events, called as general handler after all the
+    handlers of event type finished.
+    """
+
+    def __init__(self, expected: int) -> None:
+        """"""
+        self.expected: int = expected
+        self.processed: int = 0
+        self.latencies: Dict[str, List[float]] = {type: [] for type in MEASURED_TYPES}
+        self.finished: Signal = Signal()
+
+    def process_event(self, event: Event) -> None:
+        """"""
+        latencies: List[float] = self.latencies.get(event.type, None)
+        if latencies is None:
+            return
+
+        latencies.append(perf_counter() - event.data.put_time)
+
+        self.processed += 1
+        if self.processed == self.expected:
+            self.finished.set()
+
+
+def generate_steps(args: Namespace, gateway_name: str) -> List[tuple]:
+    """
+    Generate (callback name, data) of every step in advance, so that
+    creating data objects is not measured.
+    """
+    rng: Random = Random(args.seed)
+    symbols: List[str] = [f"BM{i:05d}" for i in range(args.symbols)]
+    prices: List[float] = [rng.uniform(10, 1000) for _ in symbols]
+
+    steps: List[tuple] = []
+    order_count: int = 0
+    order_budget: float = 0
+    log_budget: float = 0
+
+    now: datetime = datetime.now()
+
+    for i in range(args.count):
+        n: int = i % len(symbols)
+        symbol: str = symbols[n]
+        prices[n] *= 1 + rng.gauss(0, 0.0005)
+        price: float = round(prices[n], 2)
+
+        tick: TickData = TickData(
+            symbol=symbol,
+            exchange=Exchange.LOCAL,
+            datetime=now,
+            last_price=price,
+            volume=i,
+            bid_price_1=price - 0.01,
+            ask_price_1=price + 0.01,
+            bid_volume_1=10,
+            ask_volume_1=10,
+            gateway_name=gateway_name
+        )
+        steps.append(("on_tick", tick))
+
+        # Each order goes through submitting, not traded, trade and all traded
+        order_budget += args.order_ratio
+        while order_budget >= 1:
+            order_budget -= 1
+            order_count += 1
+
+            orderid: str = str(order_count)
+            direction: Direction = rng.choice([Direction.LONG, Direction.SHORT])
+
+            for status in [Status.SUBMITTING, Status.NOTTRADED]:
+                order: OrderData = OrderData(
+                    symbol=symbol,
+                    exchange=Exchange.LOCAL,
+                    orderid=orderid,
+                    direction=direction,
+                    offset=Offset.OPEN,
+                    price=price,
+                    volume=1,
+                    status=status,
+                    datetime=now,
+                    gateway_name=gateway_name
+                )
+                steps.append(("on_order", order))
+
+            trade: TradeData = TradeData(
+                symbol=symbol,
+                exchange=Exchange.LOCAL,
+                orderid=orderid,
+                tradeid=orderid,
+                direction=direction,
+                offset=Offset.OPEN,
+                price=price,
+                volume=1,
+                datetime=now,
+                gateway_name=gateway_name
+            )
+            steps.append(("on_trade", trade))
+
+            order = OrderData(
+                symbol=symbol,
+                exchange=Exchange.LOCAL,
+                orderid=orderid,
+                direction=direction,
+                offset=Offset.OPEN,
+                price=price,
+                volume=1,
+                traded=1,
+                status=Status.ALLTRADED,
+                datetime=now,
+                gateway_name=gateway_name
+            )
+            steps.append(("on_order", order))
+
+        log_budget += args.log_ratio
+        while log_budget >= 1:
+            log_budget -= 1
+            log: LogData = LogData(msg=f"benchmark log {i}", gateway_name=gateway_name)
+            steps.append(("on_log", log))
+
+    return steps
+
+
+def get_rss() -> int:
+    """
+    Get current resident set size in bytes.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages: int = int(f.read().split()[1])
+        return pages * resource.getpagesize()
+    except OSError:
+        return get_peak_rss()
+
+
+def get_peak_rss() -> int:
+    """
+    Get peak resident set size in bytes.
+    """
+    maxrss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is in bytes on macOS, kilobytes on Linux
+    if sys.platform == "darwin":
+        return maxrss
+    return maxrss * 1024
+
+
+def get_latency_data(latencies: List[float]) -> Dict[str, float]:
+    """
+    Get count, mean, percentiles and max of latency in microseconds.
+    """
+    if not latencies:
+        return {"count": 0}
+
+    latencies = sorted(latencies)
+    count: int = len(latencies)
+
+    data: Dict[str, float] = {
+        "count": count,
+        "mean_us": sum(latencies) / count * 1e6
+    }
+
+    for percent in PERCENTILES:
+        index: int = min(int(count * percent / 100), count - 1)
+        data[f"p{percent:g}_us"] = latencies[index] * 1e6
+
+    data["max_us"] = latencies[-1] * 1e6
+    return data
+
+
+def run_benchmark(args: Namespace) -> Dict[str, Any]:
+    """
+    Run benchmark with arguments and return results.
+    """
+    SETTINGS["log.console"] = False
+    SETTINGS["log.file"] = False
+
+    event_engine: EventEngine = EventEngine(batch_size=args.batch_size)
+    main_engine: MainEngine = MainEngine(event_engine)
+    gateway: BaseGateway = main_engine.add_gateway(BenchmarkGateway)
+
+    for i in range(args.symbols):
+        contract: ContractData = ContractData(
+            symbol=f"BM{i:05d}",
+            exchange=Exchange.LOCAL,
+            name=f"BM{i:05d}",
+            product=Product.FUTURES,
+            size=1,
+            pricetick=0.01,
+            gateway_name=gateway.gateway_name
+        )
+        gateway.on_contract(contract)
+
+    steps: List[tuple] = generate_steps(args, gateway.gateway_name)
+
+    recorder: LatencyRecorder = LatencyRecorder(len(steps))
+    event_engine.register_general(recorder.process_event)
+
+    callbacks: Dict[str, Any] = {
+        name: getattr(gateway, name)
+        for name in ["on_tick", "on_order", "on_trade", "on_log"]
+    }
+
+    rss_start: int = get_rss()
+    usage_start: resource.struct_rusage = resource.getrusage(resource.RUSAGE_SELF)
+    start: float = perf_counter()
+
+    for i, (name, data) in enumerate(steps):
+        if args.rate and not i % PACE_STEPS:
+            delay: float = start + i / args.rate - perf_counter()
+            if delay > 0:
+                sleep(delay)
+
+        data.put_time = perf_counter()
+        callbacks[name](data)
+
+    put_end: float = perf_counter()
+
+    finished: bool = recorder.finished.wait(args.timeout)
+
+    end: float = perf_counter()
+    usage_end: resource.struct_rusage = resource.getrusage(resource.RUSAGE_SELF)
+    rss_end: int = get_rss()
+
+    main_engine.close()
+
+    elapsed: float = end - start
+    cpu_user: float = usage_end.ru_utime - usage_start.ru_utime
+    cpu_system: float = usage_end.ru_stime - usage_start.ru_stime
+
+    all_latencies: List[float] = []
+    for latencies in recorder.latencies.values():
+        all_latencies.extend(latencies)
+
+    results: Dict[str, Any] = {
+        "finished": finished,
+        "events": len(steps),
+        "processed": recorder.processed,
+        "elapsed_s": elapsed,
+        "put_elapsed_s": put_end - start,
+        "throughput_eps": recorder.processed / elapsed,
+        "latency": {"all": get_latency_data(all_latencies)},
+        "cpu": {
+            "user_s": cpu_user,
+            "system_s": cpu_system,
+            "percent": (cpu_user + cpu_system) / elapsed * 100
+        },
+        "memory": {
+            "rss_start_mb": rss_start / 1024 / 1024,
+            "rss_end_mb": rss_end / 1024 / 1024,
+            "rss_peak_mb": get_peak_rss() / 1024 / 1024
+        }
+    }
+
+    for type, latencies in recorder.latencies.items():
+        results["latency"][type] = get_latency_data(latencies)
+
+    return results
+
+
+def main() -> None:
+    """"""
+    parser: ArgumentParser = ArgumentParser(description="Event hot path benchmark")
+    parser.add_argument("--symbols", type=int, default=100, help="number of symbols")
+    parser.add_argument("--count", type=int, default=200_000, help="number of ticks")
+    parser.add_argument("--rate", type=float, default=0, help="events per second, 0 for unlimited")
+    parser.add_argument("--order-ratio", type=float, default=0.05, help="orders per tick")
+    parser.add_argument("--log-ratio", type=float, default=0.01, help="logs per tick")
+    parser.add_argument("--batch-size", type=int, default=0, help="batch size of event engine")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of data")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds to wait for processing")
+    parser.add_argument("--output", type=str, default="", help="path of JSON result file")
+    args: Namespace = parser.parse_args()
+
+    results: Dict[str, Any] = run_benchmark(args)
+
+    report: Dict[str, Any] = {
+        "benchmark": "engine_suite",
+        "datetime": datetime.now().isoformat(),
+        "vnpy": vnpy.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        "results": results
+    }
+
+    print(f"events: {results['events']}, processed: {results['processed']}, "
+          f"elapsed: {results['elapsed_s']:.3f}s, throughput: {results['throughput_eps']:,.0f}/s")
+
+    for type, data in results["latency"].items():
+        if not data["count"]:
+            continue
+        print(f"{type:<10}count: {data['count']:>9}  p50: {data['p50_us']:>10.1f}us  "
+              f"p99: {data['p99_us']:>10.1f}us  p99.9: {data['p99.9_us']:>10.1f}us  "
+              f"max: {data['max_us']:>10.1f}us")
+
+    cpu: Dict[str, float] = results["cpu"]
+    memory: Dict[str, float] = results["memory"]
+    print(f"cpu: {cpu['percent']:.1f}% (user {cpu['user_s']:.2f}s, system {cpu['system_s']:.2f}s), "
+          f"rss: {memory['rss_end_mb']:.1f}MB, peak: {memory['rss_peak_mb']:.1f}MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"results written into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark of EventEngine dispatch loop: one-by-one vs batch draining.
+
+Usage:
+    python event_batch.py [event_count]
+"""
+
+import sys
+from threading import Event as Signal, Thread
+from time import perf_counter
+from typing import List
+
+from vnpy.event import Event, EventEngine
+
+
+EVENT_BENCHMARK = "eBenchmark"
+
+BATCH_SIZES: List[int] = [0, 16, 128, 1024]
+PRODUCER_COUNT: int = 2
+
+
+def run_benchmark(batch_size: int, event_count: int) -> float:
+    """
+    Put events from producer threads and return events processed per second.
+    """
+    event_engine: EventEngine = EventEngine(batch_size=batch_size)
+
+    signal: Signal = Signal()
+    processed: List[int] = [0]
+
+    def process_event(event: Event) -> None:
+        processed[0] += 1
+        if processed[0] == event_count:
+            signal.set()
+
+    event_engine.register(EVENT_BENCHMARK, process_event)
+
+    def produce(count: int) -> None:
+        for i in range(count):
+            event_engine.put(Event(EVENT_BENCHMARK, i))
+
+    per_producer: int = event_count // PRODUCER_COUNT
+    event_count = per_producer * PRODUCER_COUNT
+
+    producers: List[Thread] = [
+        Thread(target=produce, args=(per_producer,))
+        for _ in range(PRODUCER_COUNT)
+    ]
+
+    event_engine.start()
+
+    start: float = perf_counter()
+    for producer in producers:
+        producer.start()
+    signal.wait()
+    cost: float = perf_counter() - start
+
+    for producer in producers:
+        producer.join()
+    event_engine.stop()
+
+    return event_count / cost
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        event_count: int = int(sys.argv[1])
+    else:
+        event_count: int = 500_000
+
+    print(f"events: {event_count}, producers: {PRODUCER_COUNT}")
+
+    baseline: float = 0
+    for batch_size in BATCH_SIZES:
+        rate: float = run_benchmark(batch_size, event_count)
+
+        if not batch_size:
+            baseline = rate
+            name: str = "one by one"
+        else:
+            name: str = f"batch {batch_size}"
+
+        print(f"{name:<12}{rate:>14,.0f} events/s{rate / baseline:>8.2f}x")
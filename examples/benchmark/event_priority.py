@@ -0,0 +1,94 @@
+"""
+Benchmark of order event latency in EventEngine while tick events
+are saturating the queue: single FIFO queue vs priority lanes.
+
+Usage:
+    python event_priority.py [order_count]
+"""
+
+import sys
+from threading import Event as Signal, Thread
+from time import perf_counter, sleep
+from typing import Dict, List
+
+from vnpy.event import Event, EventEngine
+from vnpy.trader.event import EVENT_TICK, EVENT_ORDER, EVENT_PRIORITIES
+
+
+TICK_COST: float = 20e-6            # processing time of each tick (seconds)
+TICK_BATCH: int = 100               # ticks put between checks of stop signal
+ORDER_INTERVAL: float = 0.002       # interval between order events (seconds)
+
+
+def run_benchmark(priorities: Dict[str, int], order_count: int) -> List[float]:
+    """
+    Return sorted latency (seconds) of order events.
+    """
+    event_engine: EventEngine = EventEngine(priorities=priorities)
+
+    finished: Signal = Signal()
+    latencies: List[float] = []
+
+    def process_tick(event: Event) -> None:
+        end: float = perf_counter() + TICK_COST
+        while perf_counter() < end:
+            pass
+
+    def process_order(event: Event) -> None:
+        latencies.append(perf_counter() - event.data)
+        if len(latencies) == order_count:
+            finished.set()
+
+    event_engine.register(EVENT_TICK, process_tick)
+    event_engine.register(EVENT_ORDER, process_order)
+
+    def produce_tick() -> None:
+        while not finished.is_set():
+            for _ in range(TICK_BATCH):
+                event_engine.put(Event(EVENT_TICK))
+            sleep(0)
+
+    def produce_order() -> None:
+        for _ in range(order_count):
+            event_engine.put(Event(EVENT_ORDER, perf_counter()))
+            sleep(ORDER_INTERVAL)
+
+    tick_producer: Thread = Thread(target=produce_tick)
+    order_producer: Thread = Thread(target=produce_order)
+
+    event_engine.start()
+    tick_producer.start()
+    order_producer.start()
+
+    finished.wait()
+
+    order_producer.join()
+    tick_producer.join()
+    event_engine.stop()
+
+    latencies.sort()
+    return latencies
+
+
+def percentile(data: List[float], percent: float) -> float:
+    """
+    Get percentile from sorted data.
+    """
+    index: int = min(int(len(data) * percent / 100), len(data) - 1)
+    return data[index]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        order_count: int = int(sys.argv[1])
+    else:
+        order_count: int = 500
+
+    print(f"orders: {order_count}, tick cost: {TICK_COST * 1e6:.0f}us")
+
+    for name, priorities in [("fifo", None), ("priority", EVENT_PRIORITIES)]:
+        latencies: List[float] = run_benchmark(priorities, order_count)
+
+        p50: float = percentile(latencies, 50) * 1000
+        p99: float = percentile(latencies, 99) * 1000
+        print(f"{name:<10}p50: {p50:>10.3f}ms    p99: {p99:>10.3f}ms")
@@ -0,0 +1,134 @@
+"""
+Benchmark of binary codec vs pickle for data objects, in encoded size,
+encode time and decode time.
+
+Usage:
+    python object_codec.py [count]
+"""
+
+import pickle
+import sys
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Callable, List, Tuple
+
+from vnpy.trader.codec import encode, decode
+from vnpy.trader.constant import Direction, Exchange, Interval, Offset, Status
+from vnpy.trader.object import BarData, OrderData, TickData, TradeData
+from vnpy.trader.utility import ZoneInfo
+
+
+ROUNDS: int = 5
+
+NOW: datetime = datetime.now(ZoneInfo("Asia/Shanghai"))
+
+OBJECTS: List[Tuple[str, Any]] = [
+    (
+        "tick",
+        TickData(
+            symbol="IF2401",
+            exchange=Exchange.CFFEX,
+            datetime=NOW,
+            name="IF2401",
+            volume=123456,
+            turnover=1e10,
+            open_interest=200000,
+            last_price=3500.2,
+            bid_price_1=3500,
+            ask_price_1=3500.2,
+            bid_volume_1=10,
+            ask_volume_1=12,
+            localtime=datetime.now(),
+            gateway_name="CTP"
+        )
+    ),
+    (
+        "bar",
+        BarData(
+            symbol="IF2401",
+            exchange=Exchange.CFFEX,
+            datetime=NOW,
+            interval=Interval.MINUTE,
+            volume=1000,
+            open_price=3500,
+            high_price=3510,
+            low_price=3490,
+            close_price=3505,
+            gateway_name="DB"
+        )
+    ),
+    (
+        "order",
+        OrderData(
+            symbol="IF2401",
+            exchange=Exchange.CFFEX,
+            orderid="1_1001",
+            direction=Direction.LONG,
+            offset=Offset.OPEN,
+            price=3500,
+            volume=1,
+            status=Status.NOTTRADED,
+            datetime=NOW,
+            gateway_name="CTP"
+        )
+    ),
+    (
+        "trade",
+        TradeData(
+            symbol="IF2401",
+            exchange=Exchange.CFFEX,
+            orderid="1_1001",
+            tradeid="20001",
+            direction=Direction.LONG,
+            offset=Offset.OPEN,
+            price=3500,
+            volume=1,
+            datetime=NOW,
+            gateway_name="CTP"
+        )
+    ),
+]
+
+
+def pickle_dumps(obj: Any) -> bytes:
+    """"""
+    return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+
+def measure(func: Callable, arg: Any, count: int) -> float:
+    """
+    Return microseconds per call, best of several rounds.
+    """
+    best: float = float("inf")
+
+    for _ in range(ROUNDS):
+        start: float = perf_counter()
+        for _ in range(count):
+            func(arg)
+        best = min(best, (perf_counter() - start) / count)
+
+    return best * 1e6
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        count: int = int(sys.argv[1])
+    else:
+        count: int = 20_000
+
+    print(f"count: {count}")
+    print(f"{'':<8}{'method':<10}{'bytes':>8}{'encode us':>12}{'decode us':>12}")
+
+    for name, obj in OBJECTS:
+        for method, dumps, loads in [
+            ("pickle", pickle_dumps, pickle.loads),
+            ("codec", encode, decode)
+        ]:
+            data: bytes = dumps(obj)
+            if loads(data) != obj:
+                raise ValueError(f"Round trip failed: {method} {name}")
+
+            encode_time: float = measure(dumps, obj, count)
+            decode_time: float = measure(loads, data, count)
+
+            print(f"{name:<8}{method:<10}{len(data):>8}{encode_time:>12.2f}{decode_time:>12.2f}")
@@ -0,0 +1,173 @@
+"""
+Benchmark of data objects: dataclass with __dict__ vs slotted variant,
+in memory per object, construction rate and attribute access rate.
+
+Usage:
+    python object_slots.py [object_count]
+"""
+
+import gc
+import sys
+import tracemalloc
+from datetime import datetime
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+from vnpy.trader.constant import Direction, Exchange, Interval, Status
+from vnpy.trader.object import (
+    TickData, BarData, OrderData, TradeData,
+    SlotTickData, SlotBarData, SlotOrderData, SlotTradeData
+)
+
+
+NOW: datetime = datetime.now()
+ROUNDS: int = 5
+
+
+def create_tick(cls: type, i: int) -> object:
+    """"""
+    return cls(
+        symbol="IF2401",
+        exchange=Exchange.CFFEX,
+        datetime=NOW,
+        last_price=3500 + i * 0.2,
+        volume=i,
+        bid_price_1=3500,
+        ask_price_1=3500.2,
+        bid_volume_1=10,
+        ask_volume_1=10,
+        gateway_name="CTP"
+    )
+
+
+def create_bar(cls: type, i: int) -> object:
+    """"""
+    return cls(
+        symbol="IF2401",
+        exchange=Exchange.CFFEX,
+        datetime=NOW,
+        interval=Interval.MINUTE,
+        volume=i,
+        open_price=3500,
+        high_price=3510,
+        low_price=3490,
+        close_price=3505,
+        gateway_name="CTP"
+    )
+
+
+def create_order(cls: type, i: int) -> object:
+    """"""
+    return cls(
+        symbol="IF2401",
+        exchange=Exchange.CFFEX,
+        orderid=str(i),
+        direction=Direction.LONG,
+        price=3500,
+        volume=1,
+        status=Status.NOTTRADED,
+        datetime=NOW,
+        gateway_name="CTP"
+    )
+
+
+def create_trade(cls: type, i: int) -> object:
+    """"""
+    return cls(
+        symbol="IF2401",
+        exchange=Exchange.CFFEX,
+        orderid=str(i),
+        tradeid=str(i),
+        direction=Direction.LONG,
+        price=3500,
+        volume=1,
+        datetime=NOW,
+        gateway_name="CTP"
+    )
+
+
+CASES: List[Tuple[str, type, type, Callable]] = [
+    ("tick", TickData, SlotTickData, create_tick),
+    ("bar", BarData, SlotBarData, create_bar),
+    ("order", OrderData, SlotOrderData, create_order),
+    ("trade", TradeData, SlotTradeData, create_trade),
+]
+
+
+def measure_memory(cls: type, func: Callable, count: int) -> float:
+    """
+    Return bytes allocated per object, including attribute values.
+    """
+    gc.collect()
+    tracemalloc.start()
+
+    start: int = tracemalloc.get_traced_memory()[0]
+    objects: list = [func(cls, i) for i in range(count)]
+    end: int = tracemalloc.get_traced_memory()[0]
+
+    tracemalloc.stop()
+
+    # Exclude the list holding objects
+    size: int = end - start - sys.getsizeof(objects)
+    return size / count
+
+
+def measure_construction(cls: type, func: Callable, count: int) -> float:
+    """
+    Return objects constructed per second, best of several rounds.
+    """
+    best: float = 0
+
+    for _ in range(ROUNDS):
+        gc.collect()
+
+        start: float = perf_counter()
+        for i in range(count):
+            func(cls, i)
+        best = max(best, count / (perf_counter() - start))
+
+    return best
+
+
+def measure_access(cls: type, func: Callable, count: int) -> float:
+    """
+    Return attribute reads per second, best of several rounds.
+    """
+    obj: object = func(cls, 0)
+    best: float = 0
+
+    for _ in range(ROUNDS):
+        start: float = perf_counter()
+        for _ in range(count):
+            obj.vt_symbol
+            obj.datetime
+            obj.gateway_name
+            obj.exchange
+        best = max(best, count * 4 / (perf_counter() - start))
+
+    return best
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        count: int = int(sys.argv[1])
+    else:
+        count: int = 100_000
+
+    print(f"objects: {count}")
+    print(f"{'':<8}{'class':<16}{'bytes/obj':>12}{'construct/s':>16}{'access/s':>16}")
+
+    for name, cls, slot_cls, func in CASES:
+        results: Dict[type, tuple] = {}
+
+        for c in [cls, slot_cls]:
+            memory: float = measure_memory(c, func, count)
+            construction: float = measure_construction(c, func, count)
+            access: float = measure_access(c, func, count)
+
+            results[c] = (memory, construction, access)
+            print(f"{name:<8}{c.__name__:<16}{memory:>12.0f}{construction:>16,.0f}{access:>16,.0f}")
+
+        memory_ratio: float = results[slot_cls][0] / results[cls][0]
+        speed_ratio: float = results[slot_cls][1] / results[cls][1]
+        print(f"{'':<8}{'slot/dict':<16}{memory_ratio:>12.2f}{speed_ratio:>16.2f}")
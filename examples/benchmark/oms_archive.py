@@ -0,0 +1,116 @@
+"""
+Benchmark of OmsEngine memory and event processing time, with and without
+archiving finished orders and trades.
+
+Usage:
+    python oms_archive.py [order_count]
+"""
+
+import gc
+import sys
+import tracemalloc
+from copy import copy
+from time import perf_counter
+from typing import List
+
+from vnpy.event import Event, EventEngine
+from vnpy.trader.constant import Direction, Exchange, Offset, Status
+from vnpy.trader.engine import MainEngine, OmsEngine
+from vnpy.trader.event import EVENT_ORDER, EVENT_TRADE
+from vnpy.trader.object import OrderData, TradeData
+from vnpy.trader.setting import SETTINGS
+
+
+def create_events(count: int) -> List[Event]:
+    """
+    Create events of orders submitted, filled and traded.
+    """
+    events: List[Event] = []
+
+    for i in range(count):
+        order: OrderData = OrderData(
+            symbol="BTCUSDT",
+            exchange=Exchange.LOCAL,
+            orderid=str(i),
+            direction=Direction.LONG,
+            offset=Offset.OPEN,
+            price=30000,
+            volume=1,
+            status=Status.NOTTRADED,
+            gateway_name="BINANCE"
+        )
+        events.append(Event(EVENT_ORDER, order))
+
+        order = copy(order)
+        order.traded = 1
+        order.status = Status.ALLTRADED
+        events.append(Event(EVENT_ORDER, order))
+
+        trade: TradeData = TradeData(
+            symbol="BTCUSDT",
+            exchange=Exchange.LOCAL,
+            orderid=str(i),
+            tradeid=str(i),
+            direction=Direction.LONG,
+            offset=Offset.OPEN,
+            price=30000,
+            volume=1,
+            gateway_name="BINANCE"
+        )
+        events.append(Event(EVENT_TRADE, trade))
+
+    return events
+
+
+def run(count: int, archive: bool, trace: bool) -> float:
+    """
+    Return memory of OMS in MB if trace, otherwise microseconds per event.
+    """
+    SETTINGS["oms.archive"] = archive
+
+    main_engine: MainEngine = MainEngine(EventEngine())
+    oms: OmsEngine = main_engine.get_engine("oms")
+
+    # Events are passed to OMS handlers directly
+    handlers: dict = {
+        EVENT_ORDER: oms.process_order_event,
+        EVENT_TRADE: oms.process_trade_event
+    }
+
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+
+    events: List[Event] = create_events(count)
+    event_count: int = len(events)
+
+    start: float = perf_counter()
+    for event in events:
+        handlers[event.type](event)
+    result: float = (perf_counter() - start) / event_count * 1e6
+
+    if trace:
+        # Release events, so only objects kept by OMS are counted
+        del events
+        gc.collect()
+        result = tracemalloc.get_traced_memory()[0] / 1e6
+        tracemalloc.stop()
+
+    main_engine.close()
+    return result
+
+
+if __name__ == "__main__":
+    count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    SETTINGS["log.console"] = False
+    SETTINGS["log.file"] = False
+
+    print(f"orders: {count}, window: {SETTINGS['oms.order_window']}")
+    print(f"{'mode':<12}{'memory MB':>12}{'us/event':>12}")
+
+    for archive in [False, True]:
+        cost: float = run(count, archive, False)
+        memory: float = run(count, archive, True)
+        mode: str = "archive" if archive else "memory"
+        print(f"{mode:<12}{memory:>12.1f}{cost:>12.2f}")
@@ -0,0 +1,98 @@
+"""
+Benchmark of active order lookup in OmsEngine: scanning all active orders
+vs secondary indexes by vt_symbol, gateway and direction.
+
+Usage:
+    python oms_index.py [order_count] [symbol_count]
+"""
+
+import sys
+from time import perf_counter
+from typing import Callable, List
+
+from vnpy.event import Event, EventEngine
+from vnpy.trader.constant import Direction, Exchange, Offset, Status
+from vnpy.trader.engine import MainEngine, OmsEngine
+from vnpy.trader.event import EVENT_ORDER
+from vnpy.trader.object import OrderData
+
+
+ROUNDS: int = 5
+GATEWAYS: List[str] = ["CTP", "IB", "BINANCE", "OKX"]
+
+
+def create_orders(count: int, symbol_count: int) -> List[OrderData]:
+    """"""
+    return [
+        OrderData(
+            symbol=f"S{i % symbol_count}",
+            exchange=Exchange.LOCAL,
+            orderid=str(i),
+            direction=Direction.LONG if i % 2 else Direction.SHORT,
+            offset=Offset.OPEN,
+            price=100,
+            volume=1,
+            status=Status.NOTTRADED,
+            gateway_name=GATEWAYS[i % len(GATEWAYS)]
+        )
+        for i in range(count)
+    ]
+
+
+def scan(oms: OmsEngine, vt_symbol: str) -> List[OrderData]:
+    """
+    Lookup by scanning all active orders, as done before indexes.
+    """
+    return [order for order in oms.active_orders.values() if order.vt_symbol == vt_symbol]
+
+
+def measure(func: Callable, count: int) -> float:
+    """
+    Return microseconds per call, best of several rounds.
+    """
+    best: float = float("inf")
+
+    for _ in range(ROUNDS):
+        start: float = perf_counter()
+        for _ in range(count):
+            func()
+        best = min(best, (perf_counter() - start) / count)
+
+    return best * 1e6
+
+
+if __name__ == "__main__":
+    order_count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    symbol_count: int = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    # Events are passed to OMS handler directly without starting engine
+    event_engine: EventEngine = EventEngine()
+    main_engine: MainEngine = MainEngine(event_engine)
+    oms: OmsEngine = main_engine.get_engine("oms")
+
+    orders: List[OrderData] = create_orders(order_count, symbol_count)
+    events: List[Event] = [Event(EVENT_ORDER, order) for order in orders]
+
+    start: float = perf_counter()
+    for event in events:
+        oms.process_order_event(event)
+    insert_time: float = (perf_counter() - start) / order_count * 1e6
+
+    vt_symbol: str = orders[0].vt_symbol
+    lookup_count: int = 1000
+
+    print(f"active orders: {len(oms.active_orders)}, symbols: {symbol_count}")
+    print(f"{'case':<36}{'us/call':>12}")
+    print(f"{'process_order_event (insert)':<36}{insert_time:>12.2f}")
+
+    cases: List[tuple] = [
+        ("scan by vt_symbol", lambda: scan(oms, vt_symbol)),
+        ("index by vt_symbol", lambda: oms.get_all_active_orders(vt_symbol)),
+        ("index by gateway", lambda: oms.get_all_active_orders(gateway_name="CTP")),
+        ("index by vt_symbol+direction", lambda: oms.get_all_active_orders(vt_symbol, direction=Direction.LONG)),
+    ]
+
+    for name, func in cases:
+        print(f"{name:<36}{measure(func, lookup_count):>12.2f}")
+
+    main_engine.close()
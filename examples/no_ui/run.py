@@ -16,6 +16,7 @@ from vnpy_ctastrategy.base import EVENT_CTA_LOG
 SETTINGS["log.active"] = True
 SETTINGS["log.level"] = INFO
 SETTINGS["log.console"] = True
+SETTINGS["oms.snapshot"] = True     # Restore OMS state from last run
 
 
 ctp_setting = {
@@ -53,6 +54,30 @@ def check_trading_period():
     return trading
 
 
+def wait_for_query(main_engine, min_time=60, quiet_time=20):
+    """
+    Wait until gateway finishes the whole query cycle before reconciling
+    OMS snapshot.
+
+    CTP queries contracts first, which may take tens of seconds, and only
+    then starts querying positions and account. So wait at least min_time
+    seconds, and then until no more restored data is confirmed by gateway
+    for quiet_time seconds.
+    """
+    oms_engine = main_engine.get_engine("oms")
+
+    sleep(min_time)
+
+    last_count = -1
+    while True:
+        count = sum(len(keys) for keys in oms_engine.unconfirmed.values())
+        if count == last_count:
+            return
+
+        last_count = count
+        sleep(quiet_time)
+
+
 def run_child():
     """
     Running in the child process.
@@ -74,6 +99,13 @@ def run_child():
 
     sleep(10)
 
+    # Restored data not sent again by gateway is removed when reconciled,
+    # with positions treated as closed, so never reconcile before the
+    # query cycle finished
+    if SETTINGS["oms.snapshot"]:
+        wait_for_query(main_engine)
+        main_engine.reconcile_snapshot()
+
     cta_engine.init_engine()
     main_engine.write_log("CTA策略初始化完成")
 
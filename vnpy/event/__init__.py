@@ -1 +1,14 @@
-from .engine import Event, EventEngine, EVENT_TIMER
+from .engine import (
+    Event,
+    EventEngine,
+    EventQueue,
+    OverflowPolicy,
+    ShardedEventEngine,
+    EVENT_TIMER,
+    EVENT_SCHEDULE
+)
+from .profiler import EventProfiler
+from .timer import TimerWheel
+from .async_engine import AsyncEventEngine
+from .journal import JournalWriter, JournalReader, replay_journal
+from .shared import SharedEventPublisher, SharedEventSubscriber
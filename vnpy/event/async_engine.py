@@ -0,0 +1,257 @@
+"""
+Event engine running on asyncio event loop.
+"""
+
+import asyncio
+from collections import defaultdict
+from inspect import isawaitable
+from threading import Thread, get_ident
+from time import perf_counter
+from typing import Any, List, Optional
+
+from .engine import Event, HandlerType, EVENT_TIMER
+from .profiler import get_handler_name
+
+
+class AsyncEventEngine:
+    """
+    Event engine which distributes events within an asyncio event loop,
+    with the same API of EventEngine.
+
+    Handler can be either a normal function or a coroutine function,
+    and coroutine handlers are awaited one by one so that events are
+    still processed in order.
+
+    Event can be put from any thread. Events put within the loop thread
+    go into queue directly, while those from other threads are passed
+    into loop thread safely.
+
+    Exception raised by handler is passed to exception handler of the
+    loop (logged by asyncio by default), and processing goes on.
+    """
+
+    def __init__(
+        self,
+        interval: int = 1,
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> None:
+        """
+        If loop is not specified, a new event loop is created and run
+        in a separate thread after engine started. Otherwise the loop
+        given should be run by caller.
+        """
+        self._interval: int = interval
+        self._active: bool = False
+
+        if loop:
+            self._loop: asyncio.AbstractEventLoop = loop
+            self._thread: Optional[Thread] = None
+        else:
+            self._loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+            self._thread: Optional[Thread] = Thread(target=self._run_loop)
+
+        self._loop_ident: int = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self._handlers: defaultdict = defaultdict(list)
+        self._general_handlers: List = []
+
+    def _run_loop(self) -> None:
+        """
+        Run event loop owned by engine.
+        """
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def _get_queue(self) -> asyncio.Queue:
+        """
+        Get event queue, which is created lazily within loop thread.
+        """
+        if not self._queue:
+            self._queue = asyncio.Queue()
+            self._loop_ident = get_ident()
+        return self._queue
+
+    def _start_tasks(self) -> None:
+        """
+        Create dispatch and timer tasks within loop thread.
+        """
+        self._get_queue()
+
+        self._tasks = [
+            self._loop.create_task(self._run()),
+            self._loop.create_task(self._run_timer())
+        ]
+
+        for task in self._tasks:
+            task.add_done_callback(self._check_task)
+
+    def _check_task(self, task: asyncio.Task) -> None:
+        """
+        Report exception of dispatch or timer task ended unexpectedly.
+        """
+        if task.cancelled():
+            return
+
+        exception: Optional[BaseException] = task.exception()
+        if exception:
+            self._loop.call_exception_handler({
+                "message": f"Task of AsyncEventEngine stopped by exception: {exception!r}",
+                "exception": exception,
+                "task": task
+            })
+
+    def _cancel_tasks(self) -> None:
+        """
+        Cancel dispatch and timer tasks within loop thread.
+        """
+        for task in self._tasks:
+            task.cancel()
+
+    async def _shutdown(self) -> None:
+        """
+        Cancel tasks and wait for them finished, then stop the loop
+        owned by engine.
+        """
+        self._cancel_tasks()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._loop.stop()
+
+    async def _run(self) -> None:
+        """
+        Get event from queue and then process it.
+        """
+        queue: asyncio.Queue = self._get_queue()
+
+        while self._active:
+            event: Event = await queue.get()
+            await self._process(event)
+
+    async def _process(self, event: Event) -> None:
+        """
+        First distribute event to those handlers registered listening
+        to this type.
+
+        Then distribute event to those general handlers which listens
+        to all types.
+        """
+        if event.type in self._handlers:
+            for handler in self._handlers[event.type]:
+                try:
+                    result: Any = handler(event)
+                    if result is not None and isawaitable(result):
+                        await result
+                except Exception as e:
+                    self._report_exception(handler, event, e)
+
+        if self._general_handlers:
+            for handler in self._general_handlers:
+                try:
+                    result: Any = handler(event)
+                    if result is not None and isawaitable(result):
+                        await result
+                except Exception as e:
+                    self._report_exception(handler, event, e)
+
+    def _report_exception(self, handler: HandlerType, event: Event, exception: Exception) -> None:
+        """
+        Pass exception raised by handler to exception handler of loop.
+        """
+        self._loop.call_exception_handler({
+            "message": f"Handler {get_handler_name(handler)} raised exception processing {event.type} event",
+            "exception": exception
+        })
+
+    async def _run_timer(self) -> None:
+        """
+        Sleep by interval second(s) and then generate a timer event.
+        """
+        while self._active:
+            await asyncio.sleep(self._interval)
+            self._get_queue().put_nowait(Event(EVENT_TIMER))
+
+    def start(self) -> None:
+        """
+        Start event engine to process events and generate timer events.
+        """
+        self._active = True
+
+        if self._thread:
+            self._thread.start()
+
+        self._loop.call_soon_threadsafe(self._start_tasks)
+
+    def stop(self) -> None:
+        """
+        Stop event engine.
+        """
+        self._active = False
+
+        if self._thread:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+            self._thread.join()
+            self._loop.close()
+        elif get_ident() == self._loop_ident:
+            self._cancel_tasks()
+        else:
+            self._loop.call_soon_threadsafe(self._cancel_tasks)
+
+    def get_time(self) -> float:
+        """
+        Get current time in seconds, same clock as EventEngine in real
+        time mode.
+        """
+        return perf_counter()
+
+    def put(self, event: Event) -> None:
+        """
+        Put an event object into event queue, thread-safe.
+        """
+        if get_ident() == self._loop_ident:
+            self._queue.put_nowait(event)
+        else:
+            self._loop.call_soon_threadsafe(self._put_nowait, event)
+
+    def _put_nowait(self, event: Event) -> None:
+        """
+        Put an event object into event queue within loop thread.
+        """
+        self._get_queue().put_nowait(event)
+
+    def register(self, type: str, handler: HandlerType) -> None:
+        """
+        Register a new handler function (or coroutine function) for a
+        specific event type. Every function can only be registered once
+        for each event type.
+        """
+        handler_list: list = self._handlers[type]
+        if handler not in handler_list:
+            handler_list.append(handler)
+
+    def unregister(self, type: str, handler: HandlerType) -> None:
+        """
+        Unregister an existing handler function from event engine.
+        """
+        handler_list: list = self._handlers[type]
+
+        if handler in handler_list:
+            handler_list.remove(handler)
+
+        if not handler_list:
+            self._handlers.pop(type)
+
+    def register_general(self, handler: HandlerType) -> None:
+        """
+        Register a new handler function for all event types. Every
+        function can only be registered once for each event type.
+        """
+        if handler not in self._general_handlers:
+            self._general_handlers.append(handler)
+
+    def unregister_general(self, handler: HandlerType) -> None:
+        """
+        Unregister an existing general handler function.
+        """
+        if handler in self._general_handlers:
+            self._general_handlers.remove(handler)
@@ -2,13 +2,38 @@
 Event-driven framework of VeighNa framework.
 """
 
-from collections import defaultdict
+import sys
+import traceback
+from collections import defaultdict, deque
+from datetime import datetime
+from enum import Enum
 from queue import Empty, Queue
-from threading import Thread
-from time import sleep
-from typing import Any, Callable, List
+from threading import Condition, Lock, Thread, get_ident
+from types import FrameType
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from .profiler import EventProfiler, get_handler_name
+from .timer import Timer, TimerWheel
+
+if TYPE_CHECKING:
+    from .journal import JournalWriter
 
 EVENT_TIMER = "eTimer"
+EVENT_SCHEDULE = "eSchedule"
+
+# Max number of event types kept in route cache of queue. Event types
+# may be unbounded (e.g. EVENT_ORDER + vt_orderid), so the cache is
+# cleared when full.
+ROUTE_CACHE_SIZE: int = 1024
+
+# Max number of event types kept in dispatch table of engine, cleared
+# when full for the same reason.
+DISPATCH_CACHE_SIZE: int = 1024
+
+# Max number of timer events generated by one move of virtual clock in
+# simulated mode, intervals beyond it are skipped.
+SIMULATED_TIMER_LIMIT: int = 3600
 
 
 class Event:
@@ -28,6 +53,309 @@ class Event:
 HandlerType: callable = Callable[[Event], None]
 
 
+# Handlers called for event of a type, and filtered handlers of the type
+# by (attribute name of event data, {attribute value: handlers}).
+DispatchEntry = Tuple[List[HandlerType], List[Tuple[str, Dict[Hashable, List[HandlerType]]]]]
+
+
+# Defines function for getting timestamp of event in simulated mode.
+TimeFuncType: callable = Callable[[Event], Optional[float]]
+
+
+def get_event_time(event: Event) -> Optional[float]:
+    """
+    Get default timestamp of event: datetime of event data if exists.
+    """
+    dt: Optional[datetime] = getattr(event.data, "datetime", None)
+    if dt is None:
+        return None
+    return dt.timestamp()
+
+
+class OverflowPolicy(Enum):
+    """
+    Policy of handling new event when bounded event queue is full.
+    """
+
+    BLOCK = "block"                 # block producer until there's space
+    DROP_OLDEST = "drop_oldest"     # drop the oldest queued event of same type
+    DROP_NEWEST = "drop_newest"     # drop the new event
+    CONFLATE = "conflate"           # replace queued event with same vt_symbol
+
+
+class EventQueue(Queue):
+    """
+    Event queue which supports priority lanes, conflation of specific
+    event types, and overflow policies when queue is bounded.
+
+    Priorities map event types to lanes (0 is the highest). Events are
+    always taken from the highest non-empty lane, and keep FIFO order
+    within each lane. Event types not in priorities go to the lowest
+    lane.
+
+    For event types to be conflated, only the latest pending event of
+    each vt_symbol is kept. A new event replaces the pending one at its
+    original position in queue, so conflated events are never delayed
+    by newer ones. Events of other types are always kept lossless.
+
+    If maxsize is positive, policies decide what to do with new event
+    of each type when queue is full (BLOCK by default). CONFLATE falls
+    back to BLOCK if no pending event has the same vt_symbol, and
+    DROP_OLDEST falls back to DROP_NEWEST if no event of the same type
+    is queued. Events of conflated types replace the pending one before
+    any policy is applied.
+
+    Priorities, conflate_types and policies are all matched by prefix
+    (the longest one wins), so that e.g. "eTick." also applies to the
+    "eTick." + vt_symbol events.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        conflate_types: Sequence[str] = (),
+        priorities: Dict[str, int] = None,
+        policies: Dict[str, OverflowPolicy] = None
+    ) -> None:
+        """"""
+        self.conflate_types: Tuple[str, ...] = tuple(conflate_types)
+        self.priorities: Dict[str, int] = priorities or {}
+        self.policies: Dict[str, OverflowPolicy] = policies or {}
+
+        self.conflated_count: int = 0
+        self.dropped_count: int = 0
+        self.blocked_count: int = 0
+        self.blocked_time: float = 0
+        self.blocking: bool = True
+
+        super().__init__(maxsize)
+
+    def _init(self, maxsize: int) -> None:
+        """
+        Initialize queue storage (called by Queue.__init__).
+
+        Items of conflated events and those may be dropped when full
+        are stored as [event, key, type] slot lists, which can be updated
+        in place by newer events with the same key, or emptied when
+        dropped.
+        """
+        lane_count: int = max(self.priorities.values(), default=0) + 1
+        self.lanes: List[deque] = [deque() for _ in range(lane_count)]
+
+        self._size: int = 0
+        self._slots: Dict[Tuple[str, str], list] = {}
+        self._typed_slots: Dict[str, deque] = defaultdict(deque)
+        self._routes: Dict[str, Tuple[deque, bool, OverflowPolicy]] = {}
+
+    def _route(self, type: str) -> Tuple[deque, bool, OverflowPolicy]:
+        """
+        Get lane, whether to conflate and overflow policy for event type.
+        """
+        prefix: str = match_prefix(type, self.priorities)
+        if prefix:
+            lane: deque = self.lanes[self.priorities[prefix]]
+        else:
+            lane: deque = self.lanes[-1]
+
+        conflated: bool = type.startswith(self.conflate_types)
+
+        prefix = match_prefix(type, self.policies)
+        if prefix:
+            policy: OverflowPolicy = self.policies[prefix]
+        else:
+            policy: OverflowPolicy = OverflowPolicy.BLOCK
+
+        route: Tuple[deque, bool, OverflowPolicy] = (lane, conflated, policy)
+
+        if len(self._routes) >= ROUTE_CACHE_SIZE:
+            self._routes.clear()
+        self._routes[type] = route
+        return route
+
+    def put(self, event: Event, block: bool = True) -> None:
+        """
+        Put event into queue, following overflow policy if queue is full.
+
+        If block is False, events with BLOCK policy are put into queue
+        exceeding maxsize rather than blocking, which is used for events
+        put within internal threads of event engine to avoid deadlock.
+        """
+        with self.not_full:
+            if 0 < self.maxsize <= self._size:
+                route: Optional[tuple] = self._routes.get(event.type, None)
+                if not route:
+                    route = self._route(event.type)
+                policy: OverflowPolicy = route[2]
+
+                # Conflated event takes no more space if pending one found
+                if route[1] and self._conflate(event):
+                    return
+
+                if policy is OverflowPolicy.DROP_NEWEST:
+                    self.dropped_count += 1
+                    return
+                elif policy is OverflowPolicy.DROP_OLDEST:
+                    self.dropped_count += 1
+                    if not self._drop_oldest(event.type):
+                        return
+                elif policy is OverflowPolicy.CONFLATE and self._conflate(event):
+                    return
+                elif block and self.blocking:
+                    start: float = perf_counter()
+                    while self.blocking and self.maxsize <= self._size:
+                        self.not_full.wait()
+
+                    self.blocked_count += 1
+                    self.blocked_time += perf_counter() - start
+
+            self._put(event)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def release(self) -> None:
+        """
+        Wake up all producers blocked and never block again, called when
+        event engine is stopped so that nothing waits for consumers.
+        """
+        with self.not_full:
+            self.blocking = False
+            self.not_full.notify_all()
+
+    def _drop_oldest(self, type: str) -> bool:
+        """
+        Drop the oldest queued event of type, return False if not found.
+        """
+        slots: Optional[deque] = self._typed_slots.get(type, None)
+        if not slots:
+            return False
+
+        slot: list = slots.popleft()
+        slot[0] = None
+        self._size -= 1
+
+        key: Optional[tuple] = slot[1]
+        if key and self._slots.get(key, None) is slot:
+            self._slots.pop(key)
+
+        return True
+
+    def _conflate(self, event: Event) -> bool:
+        """
+        Replace pending event with same vt_symbol, return False if not found.
+        """
+        vt_symbol: Optional[str] = getattr(event.data, "vt_symbol", None)
+        slot: Optional[list] = self._slots.get((event.type, vt_symbol), None)
+        if not slot:
+            return False
+
+        slot[0] = event
+        self.conflated_count += 1
+        return True
+
+    def _qsize(self) -> int:
+        """"""
+        return self._size
+
+    def _put(self, event: Event) -> None:
+        """"""
+        route: Optional[tuple] = self._routes.get(event.type, None)
+        if not route:
+            route = self._route(event.type)
+        lane, conflated, policy = route
+
+        # Plain events are appended into lane directly
+        if not conflated and (
+            policy is OverflowPolicy.BLOCK or policy is OverflowPolicy.DROP_NEWEST
+        ):
+            lane.append(event)
+            self._size += 1
+            return
+
+        # Conflated events and those may be conflated when full are keyed
+        key: Optional[tuple] = None
+        if conflated or policy is OverflowPolicy.CONFLATE:
+            vt_symbol: Optional[str] = getattr(event.data, "vt_symbol", None)
+            if vt_symbol is not None:
+                key = (event.type, vt_symbol)
+
+        if conflated and key and self._conflate(event):
+            return
+
+        slot: list = [event, key, event.type]
+        if key:
+            self._slots[key] = slot
+        if policy is OverflowPolicy.DROP_OLDEST:
+            self._typed_slots[event.type].append(slot)
+
+        lane.append(slot)
+        self._size += 1
+
+    def _get(self) -> Event:
+        """"""
+        while True:
+            for lane in self.lanes:
+                if lane:
+                    item: Any = lane.popleft()
+                    break
+
+            if item.__class__ is not list:
+                self._size -= 1
+                return item
+
+            # Skip slots of events already dropped
+            event: Optional[Event] = item[0]
+            if event is None:
+                continue
+
+            self._size -= 1
+
+            key: Optional[tuple] = item[1]
+            if key and self._slots.get(key, None) is item:
+                self._slots.pop(key)
+
+            slots: Optional[deque] = self._typed_slots.get(item[2], None)
+            if slots:
+                slots.popleft()
+
+            return event
+
+
+def match_prefix(type: str, prefixes: Dict[str, Any]) -> str:
+    """
+    Get the longest key of prefixes which event type starts with.
+    """
+    matched: str = ""
+    for prefix in prefixes.keys():
+        if type.startswith(prefix) and len(prefix) > len(matched):
+            matched = prefix
+    return matched
+
+
+def get_oldest_put_time(queue: Queue) -> Optional[float]:
+    """
+    Get put time of the oldest event in queue, if recorded.
+    """
+    with queue.mutex:
+        if isinstance(queue, EventQueue):
+            items: list = [lane[0] for lane in queue.lanes if lane]
+        elif queue.queue:
+            items: list = [queue.queue[0]]
+        else:
+            items: list = []
+
+    put_times: List[float] = []
+    for item in items:
+        # Conflated events are stored in [event, key] slot lists
+        if item.__class__ is list:
+            item = item[0]
+
+        put_time: Optional[float] = getattr(item, "put_time", None)
+        if put_time:
+            put_times.append(put_time)
+
+    return min(put_times, default=None)
+
+
 class EventEngine:
     """
     Event engine distributes event object based on its type
@@ -37,30 +365,165 @@ class EventEngine:
     which can be used for timing purpose.
     """
 
-    def __init__(self, interval: int = 1) -> None:
+    def __init__(
+        self,
+        interval: int = 1,
+        batch_size: int = 0,
+        conflate_types: Sequence[str] = None,
+        priorities: Dict[str, int] = None,
+        maxsize: int = 0,
+        policies: Dict[str, OverflowPolicy] = None,
+        simulated: bool = False,
+        time_func: TimeFuncType = get_event_time
+    ) -> None:
         """
         Timer event is generated every 1 second by default, if
         interval not specified.
+
+        If batch_size is positive, events queued are drained in
+        batches of at most batch_size and then processed in order,
+        which reduces the locking overhead of queue under bursts.
+
+        Event types in conflate_types (e.g. [EVENT_TICK]) are conflated
+        in queue, only the latest pending event of each vt_symbol is
+        kept.
+
+        Priorities (e.g. EVENT_PRIORITIES in vnpy.trader.event) map event
+        types to priority lanes, so that events in higher lanes (smaller
+        number) are processed before those queued in lower lanes.
+
+        If maxsize is positive, the queue is bounded and policies (e.g.
+        {EVENT_TICK: OverflowPolicy.CONFLATE}) decide how to handle new
+        event of each type when queue is full, BLOCK by default. Events
+        put within event processing, timer and scheduler threads never
+        block, to avoid deadlock.
+
+        See EventQueue for details of conflation, priority lanes and
+        overflow policies.
+
+        If simulated is True, engine runs on a virtual clock driven by
+        timestamps of events put from outside the engine (got by
+        time_func, datetime of event data by default), while events put
+        by handlers never move the clock. Timer events and scheduled
+        callbacks are put according to the virtual clock right before
+        the event which moves clock past them, rather than by real sleep.
         """
         self._interval: int = interval
-        self._queue: Queue = Queue()
+        self._batch_size: int = batch_size
+        self._conflate_types: Sequence[str] = conflate_types
+        self._priorities: Dict[str, int] = priorities
+        self._maxsize: int = maxsize
+        self._policies: Dict[str, OverflowPolicy] = policies
+        self._simulated: bool = simulated
+        self._time_func: TimeFuncType = time_func
+        self._time: Optional[float] = None
+        self._next_timer_time: float = 0
+        self._queue: Queue = self._create_queue()
+        self._queues: List[Queue] = [self._queue]
         self._active: bool = False
-        self._thread: Thread = Thread(target=self._run)
+        self._thread: Thread = self._create_thread(self._queue)
+        self._threads: List[Thread] = [self._thread]
+        self._thread_idents: set = set()
         self._timer: Thread = Thread(target=self._run_timer)
         self._handlers: defaultdict = defaultdict(list)
         self._general_handlers: List = []
+        self._prefix_handlers: Dict[str, List[HandlerType]] = {}
+        self._filter_handlers: Dict[str, Dict[str, Dict[Hashable, List[HandlerType]]]] = {}
+
+        self._dispatch: Dict[str, DispatchEntry] = {}
+        self._dispatch_lock: Lock = Lock()
 
-    def _run(self) -> None:
+        self._journal: Optional["JournalWriter"] = None
+
+        self._tracing: bool = False
+        self._profiler: Optional[EventProfiler] = None
+        self._report_interval: int = 0
+        self._report_count: int = 0
+        self._report_func: Callable[[str], None] = None
+
+        self._watching: Dict[int, Tuple[HandlerType, float, str]] = {}
+        self._watchdog_active: bool = False
+        self._handler_timeout: float = 0
+        self._queue_timeout: float = 0
+        self._alarm_func: Callable[[str], None] = None
+        self._alarmed_calls: set = set()
+        self._queue_alarmed: bool = False
+
+        self._wheel: TimerWheel = TimerWheel()
+        self._wheel_condition: Condition = Condition()
+        self._scheduler: Thread = Thread(target=self._run_scheduler)
+
+    def _create_queue(self) -> Queue:
+        """
+        Create a queue object for buffering events.
+        """
+        if self._conflate_types or self._priorities or self._maxsize > 0:
+            return EventQueue(
+                maxsize=self._maxsize,
+                conflate_types=self._conflate_types or (),
+                priorities=self._priorities,
+                policies=self._policies
+            )
+        else:
+            return Queue()
+
+    def _create_thread(self, queue: Queue) -> Thread:
+        """
+        Create a thread for processing events from queue.
+        """
+        if self._batch_size > 0:
+            return Thread(target=self._run_batch, args=(queue,))
+        else:
+            return Thread(target=self._run, args=(queue,))
+
+    def _run(self, queue: Queue) -> None:
         """
         Get event from queue and then process it.
         """
         while self._active:
             try:
-                event: Event = self._queue.get(block=True, timeout=1)
+                event: Event = queue.get(block=True, timeout=1)
                 self._process(event)
             except Empty:
                 pass
 
+    def _run_batch(self, queue: Queue) -> None:
+        """
+        Wait for the first event from queue, then drain all the other
+        queued events (up to batch size) and process them in order.
+        """
+        while self._active:
+            try:
+                event: Event = queue.get(block=True, timeout=1)
+            except Empty:
+                continue
+
+            events: List[Event] = self._get_batch(queue, self._batch_size - 1)
+            self._process(event)
+            for event in events:
+                self._process(event)
+
+    def _get_batch(self, queue: Queue, size: int) -> List[Event]:
+        """
+        Get at most size events from queue without blocking.
+
+        All events are taken within one acquisition of the queue lock,
+        using the internal _qsize/_get methods which Queue subclasses
+        override to change queuing behaviour.
+        """
+        events: List[Event] = []
+
+        with queue.mutex:
+            count: int = min(queue._qsize(), size)
+            if not count:
+                return events
+
+            for _ in range(count):
+                events.append(queue._get())
+            queue.not_full.notify(count)
+
+        return events
+
     def _process(self, event: Event) -> None:
         """
         First distribute event to those handlers registered listening
@@ -69,75 +532,718 @@ class EventEngine:
         Then distribute event to those general handlers which listens
         to all types.
         """
-        if event.type in self._handlers:
-            [handler(event) for handler in self._handlers[event.type]]
+        if self._tracing:
+            self._process_traced(event)
+            return
+
+        entry: Optional[DispatchEntry] = self._dispatch.get(event.type, None)
+        if entry is None:
+            entry = self._compile(event.type)
+
+        handlers, filters = entry
+        [handler(event) for handler in handlers]
+
+        if filters:
+            for name, table in filters:
+                filtered: Optional[list] = table.get(getattr(event.data, name, None), None)
+                if filtered:
+                    [handler(event) for handler in filtered]
+
+    def _compile(self, type: str) -> DispatchEntry:
+        """
+        Resolve all handlers which should be called for event type into
+        dispatch table, which is cleared when any handler registered or
+        unregistered (or full), and then compiled again lazily by event
+        type.
+
+        Handlers are called in order of: handlers of the type, handlers
+        of matched prefixes (shorter prefix first), general handlers,
+        and then filtered handlers of the type.
+
+        Schedule events carry callbacks of engine itself, so they are
+        never passed to any handler registered.
+        """
+        if type == EVENT_SCHEDULE:
+            return ([self._process_schedule], [])
+
+        with self._dispatch_lock:
+            prefix_handlers: List[HandlerType] = []
+            for prefix in sorted(self._prefix_handlers.keys(), key=len):
+                if type.startswith(prefix):
+                    for handler in self._prefix_handlers[prefix]:
+                        if handler not in prefix_handlers:
+                            prefix_handlers.append(handler)
 
-        if self._general_handlers:
-            [handler(event) for handler in self._general_handlers]
+            handlers: List[HandlerType] = (
+                self._handlers.get(type, [])
+                + prefix_handlers
+                + self._general_handlers
+            )
+
+            filters: list = [
+                (name, {key: list(filtered) for key, filtered in table.items()})
+                for name, table in self._filter_handlers.get(type, {}).items()
+            ]
+
+            entry: DispatchEntry = (handlers, filters)
+
+            if len(self._dispatch) >= DISPATCH_CACHE_SIZE:
+                self._dispatch = {}
+            self._dispatch[type] = entry
+
+        return entry
+
+    def _get_handlers(self, event: Event) -> List[HandlerType]:
+        """
+        Get all handlers which should be called for event.
+        """
+        entry: Optional[DispatchEntry] = self._dispatch.get(event.type, None)
+        if entry is None:
+            entry = self._compile(event.type)
+
+        handlers, filters = entry
+        handlers = list(handlers)
+
+        for name, table in filters:
+            handlers.extend(table.get(getattr(event.data, name, None), []))
+
+        return handlers
+
+    def _process_traced(self, event: Event) -> None:
+        """
+        Same as _process, with queue waiting time and processing time
+        of each handler recorded into profiler, and handler currently
+        running exposed to watchdog.
+        """
+        profiler: Optional[EventProfiler] = self._profiler
+        watchdog_active: bool = self._watchdog_active
+        ident: int = get_ident()
+
+        start: float = perf_counter()
+
+        put_time: Optional[float] = getattr(event, "put_time", None)
+        if profiler and put_time:
+            profiler.record_wait(event.type, start - put_time)
+
+        for handler in self._get_handlers(event):
+            if watchdog_active:
+                self._watching[ident] = (handler, start, event.type)
+
+            handler(event)
+
+            end: float = perf_counter()
+            if profiler:
+                profiler.record_handler(event.type, handler, end - start)
+            start = end
+
+        self._watching.pop(ident, None)
+
+    def _trace_put(self, event: Event, queue: Queue) -> None:
+        """
+        Record put time of event and queue size before putting.
+        """
+        event.put_time = perf_counter()
+
+        if self._profiler:
+            self._profiler.record_queue_size(queue.qsize())
 
     def _run_timer(self) -> None:
         """
         Sleep by interval second(s) and then generate a timer event.
         """
+        # Timer events never block on bounded queue
+        self._thread_idents.add(get_ident())
+
         while self._active:
             sleep(self._interval)
             event: Event = Event(EVENT_TIMER)
             self.put(event)
 
+            if self._watchdog_active:
+                self._check_watchdog()
+
+    def _check_watchdog(self) -> None:
+        """
+        Check whether any handler has been running longer than handler
+        timeout, or the oldest queued event has been waiting longer than
+        queue timeout, and alarm if so.
+        """
+        now: float = perf_counter()
+
+        # Check handlers running in every processing thread
+        frames: Dict[int, FrameType] = sys._current_frames()
+        calls: set = set()
+
+        for ident, (handler, start, type) in list(self._watching.items()):
+            cost: float = now - start
+            if cost < self._handler_timeout:
+                continue
+
+            call: Tuple[int, float] = (ident, start)
+            calls.add(call)
+            if call in self._alarmed_calls:
+                continue
+
+            frame: Optional[FrameType] = frames.get(ident, None)
+            if frame:
+                stack: str = "".join(traceback.format_stack(frame))
+            else:
+                stack: str = ""
+
+            self._alarm_func(
+                f"Handler {get_handler_name(handler)} has been processing "
+                f"{type} event for {cost:.3f}s\n{stack}"
+            )
+
+        self._alarmed_calls = calls
+
+        # Check waiting time of the oldest event queued
+        put_times: List[float] = []
+        for queue in self._queues:
+            put_time: Optional[float] = get_oldest_put_time(queue)
+            if put_time:
+                put_times.append(put_time)
+
+        if not put_times:
+            self._queue_alarmed = False
+            return
+
+        lag: float = now - min(put_times)
+        if lag < self._queue_timeout:
+            self._queue_alarmed = False
+        elif not self._queue_alarmed:
+            self._queue_alarmed = True
+            self._alarm_func(f"Oldest event has been waiting in queue for {lag:.3f}s")
+
+    def _run_scheduler(self) -> None:
+        """
+        Move timer wheel forward to current time, put schedule events of
+        expired timers, then wait until the next deadline.
+        """
+        wheel: TimerWheel = self._wheel
+        condition: Condition = self._wheel_condition
+
+        # Schedule events never block on bounded queue
+        self._thread_idents.add(get_ident())
+
+        while True:
+            with condition:
+                # Checked with condition held, so wakeup by stop is never lost
+                if not self._active:
+                    break
+
+                timers: List[Timer] = wheel.advance(perf_counter())
+
+                if not timers:
+                    next_time: Optional[float] = wheel.get_next_time()
+
+                    if next_time is None:
+                        condition.wait()
+                    else:
+                        timeout: float = next_time - perf_counter()
+                        if timeout > 0:
+                            condition.wait(timeout)
+
+            for timer in timers:
+                self.put(Event(EVENT_SCHEDULE, timer))
+
+    def _process_schedule(self, event: Event) -> None:
+        """
+        Call callback of timer expired, unless it's cancelled.
+        """
+        timer: Timer = event.data
+        if timer.active:
+            timer.callback()
+
+    def schedule(
+        self,
+        callback: Callable[[], None],
+        delay: float,
+        interval: float = 0
+    ) -> int:
+        """
+        Schedule callback to be called in event processing thread after
+        delay seconds, and then every interval seconds if interval is
+        positive. Resolution of timer is 1 millisecond.
+
+        In simulated mode, delay of callback scheduled before the virtual
+        clock starts is counted from the first timestamp.
+
+        Return timer id which can be used to cancel the schedule.
+        """
+        with self._wheel_condition:
+            timer: Timer = self._wheel.add(callback, delay, interval, self.get_time())
+            self._wheel_condition.notify()
+
+        return timer.timer_id
+
+    def cancel_schedule(self, timer_id: int) -> bool:
+        """
+        Cancel a scheduled callback by timer id.
+        """
+        with self._wheel_condition:
+            return self._wheel.cancel(timer_id)
+
+    def get_time(self) -> float:
+        """
+        Get current time in seconds used by timer: timestamp of virtual
+        clock in simulated mode, otherwise performance counter.
+        """
+        if self._simulated:
+            return self._time or 0
+        else:
+            return perf_counter()
+
+    def set_time(self, timestamp: float) -> None:
+        """
+        Move virtual clock to timestamp in simulated mode, with timer
+        events and scheduled callbacks expired put into queue.
+
+        At most SIMULATED_TIMER_LIMIT timer events are put for one move,
+        so that a far jump of clock (e.g. a bad timestamp) never floods
+        the queue.
+        """
+        if not self._simulated:
+            return
+
+        events: List[Event] = []
+
+        with self._wheel_condition:
+            # Clock starts from the first timestamp, with timers scheduled
+            # before counted from it
+            if self._time is None:
+                self._time = timestamp
+                self._next_timer_time = timestamp + self._interval
+                self._wheel.rebase(timestamp)
+            elif timestamp <= self._time:
+                return
+
+            # Generate timer and schedule events in order of time
+            timer_count: int = 0
+
+            while True:
+                schedule_time: Optional[float] = self._wheel.get_next_time()
+
+                if (
+                    schedule_time is not None
+                    and schedule_time <= timestamp
+                    and schedule_time < self._next_timer_time
+                ):
+                    self._time = schedule_time
+                    for timer in self._wheel.advance(schedule_time):
+                        events.append(Event(EVENT_SCHEDULE, timer))
+                elif self._next_timer_time <= timestamp:
+                    if timer_count >= SIMULATED_TIMER_LIMIT:
+                        missed: int = int((timestamp - self._next_timer_time) // self._interval) + 1
+                        self._next_timer_time += missed * self._interval
+                        continue
+
+                    self._time = self._next_timer_time
+                    self._next_timer_time += self._interval
+                    events.append(Event(EVENT_TIMER))
+                    timer_count += 1
+                else:
+                    break
+
+            self._time = timestamp
+            self._wheel.advance(timestamp)
+
+        for event in events:
+            self.put(event)
+
+    def _advance_clock(self, event: Event) -> None:
+        """
+        Move virtual clock by timestamp of event in simulated mode.
+        """
+        timestamp: Optional[float] = self._time_func(event)
+        if timestamp is not None:
+            self.set_time(timestamp)
+
     def start(self) -> None:
         """
         Start event engine to process events and generate timer events.
         """
         self._active = True
-        self._thread.start()
-        self._timer.start()
+        for thread in self._threads:
+            thread.start()
+        self._thread_idents = {thread.ident for thread in self._threads}
+
+        if not self._simulated:
+            self._timer.start()
+            self._scheduler.start()
 
     def stop(self) -> None:
         """
         Stop event engine.
         """
         self._active = False
-        self._timer.join()
-        self._thread.join()
+
+        # Wake up producers blocked by bounded queue
+        for queue in self._queues:
+            if isinstance(queue, EventQueue):
+                queue.release()
+
+        with self._wheel_condition:
+            self._wheel_condition.notify()
+
+        if not self._simulated:
+            self._timer.join()
+            self._scheduler.join()
+
+        for thread in self._threads:
+            thread.join()
 
     def put(self, event: Event) -> None:
         """
         Put an event object into event queue.
         """
-        self._queue.put(event)
+        self._put_queue(self._queue, event)
+
+    def _put_queue(self, queue: Queue, event: Event) -> None:
+        """
+        Put an event object into specific queue.
+        """
+        # Events put by handlers (e.g. results stamped with wall-clock
+        # time) never move virtual clock
+        if self._simulated and get_ident() not in self._thread_idents:
+            self._advance_clock(event)
+
+        if self._journal:
+            self._journal.write(event)
+
+        if self._tracing:
+            self._trace_put(event, queue)
+
+        if self._maxsize > 0:
+            queue.put(event, get_ident() not in self._thread_idents)
+        else:
+            queue.put(event)
+
+    def set_journal(self, journal: Optional["JournalWriter"]) -> None:
+        """
+        Set journal writer for recording every event put into engine,
+        or None to stop recording. The journal should be closed by caller.
+        """
+        self._journal = journal
+
+    def enable_profiling(
+        self,
+        report_interval: int = 0,
+        report_func: Callable[[str], None] = print
+    ) -> EventProfiler:
+        """
+        Start recording handler processing time and queue statistics.
+
+        If report_interval is positive, summary of profiler is passed to
+        report_func every report_interval timer events.
+        """
+        if not self._profiler:
+            self._profiler = EventProfiler()
+            self._tracing = True
+
+        self._report_interval = report_interval
+        self._report_func = report_func
+        self._report_count = 0
+
+        if report_interval > 0:
+            self.register(EVENT_TIMER, self._report_profile)
+        else:
+            self.unregister(EVENT_TIMER, self._report_profile)
+
+        return self._profiler
+
+    def disable_profiling(self) -> None:
+        """
+        Stop recording handler processing time and queue statistics.
+        """
+        self.unregister(EVENT_TIMER, self._report_profile)
+        self._profiler = None
+        self._tracing = self._watchdog_active
+
+    def enable_watchdog(
+        self,
+        handler_timeout: float = 1,
+        queue_timeout: float = 1,
+        alarm_func: Callable[[str], None] = print
+    ) -> None:
+        """
+        Start watchdog which is checked by timer thread every interval.
+
+        Alarm message is passed to alarm_func when a handler has been
+        processing one event longer than handler_timeout (with stack
+        sample of the processing thread), or when the oldest event
+        queued has been waiting longer than queue_timeout (seconds).
+        """
+        self._handler_timeout = handler_timeout
+        self._queue_timeout = queue_timeout
+        self._alarm_func = alarm_func
+        self._alarmed_calls.clear()
+        self._queue_alarmed = False
+
+        self._watchdog_active = True
+        self._tracing = True
+
+    def disable_watchdog(self) -> None:
+        """
+        Stop watchdog.
+        """
+        self._watchdog_active = False
+        self._tracing = bool(self._profiler)
+        self._watching.clear()
+
+    def get_profiler(self) -> Optional[EventProfiler]:
+        """
+        Get profiler object if profiling is enabled.
+        """
+        return self._profiler
+
+    def _report_profile(self, event: Event) -> None:
+        """
+        Report profiler summary every report interval.
+        """
+        self._report_count += 1
+        if self._report_count < self._report_interval:
+            return
+        self._report_count = 0
+
+        if self._profiler:
+            self._report_func(self._profiler.get_summary())
+
+    def get_conflated_count(self) -> int:
+        """
+        Get number of events dropped by conflation so far.
+        """
+        return sum(getattr(queue, "conflated_count", 0) for queue in self._queues)
+
+    def get_queue_stats(self) -> Dict[str, float]:
+        """
+        Get statistics of event queue(s): current size, number of events
+        conflated and dropped, number and total time (seconds) of
+        producers blocked.
+        """
+        stats: Dict[str, float] = {
+            "size": 0,
+            "conflated_count": 0,
+            "dropped_count": 0,
+            "blocked_count": 0,
+            "blocked_time": 0
+        }
+
+        for queue in self._queues:
+            stats["size"] += queue.qsize()
+
+            if isinstance(queue, EventQueue):
+                stats["conflated_count"] += queue.conflated_count
+                stats["dropped_count"] += queue.dropped_count
+                stats["blocked_count"] += queue.blocked_count
+                stats["blocked_time"] += queue.blocked_time
+
+        return stats
 
     def register(self, type: str, handler: HandlerType) -> None:
         """
         Register a new handler function for a specific event type. Every
         function can only be registered once for each event type.
         """
-        handler_list: list = self._handlers[type]
-        if handler not in handler_list:
-            handler_list.append(handler)
+        with self._dispatch_lock:
+            handler_list: list = self._handlers[type]
+            if handler not in handler_list:
+                handler_list.append(handler)
+
+            self._dispatch = {}
 
     def unregister(self, type: str, handler: HandlerType) -> None:
         """
         Unregister an existing handler function from event engine.
         """
-        handler_list: list = self._handlers[type]
+        with self._dispatch_lock:
+            handler_list: list = self._handlers[type]
+
+            if handler in handler_list:
+                handler_list.remove(handler)
 
-        if handler in handler_list:
-            handler_list.remove(handler)
+            if not handler_list:
+                self._handlers.pop(type)
 
-        if not handler_list:
-            self._handlers.pop(type)
+            self._dispatch = {}
 
     def register_general(self, handler: HandlerType) -> None:
         """
         Register a new handler function for all event types. Every
         function can only be registered once for each event type.
         """
-        if handler not in self._general_handlers:
-            self._general_handlers.append(handler)
+        with self._dispatch_lock:
+            if handler not in self._general_handlers:
+                self._general_handlers.append(handler)
+
+            self._dispatch = {}
 
     def unregister_general(self, handler: HandlerType) -> None:
         """
         Unregister an existing general handler function.
         """
-        if handler in self._general_handlers:
-            self._general_handlers.remove(handler)
+        with self._dispatch_lock:
+            if handler in self._general_handlers:
+                self._general_handlers.remove(handler)
+
+            self._dispatch = {}
+
+    def register_prefix(self, prefix: str, handler: HandlerType) -> None:
+        """
+        Register a new handler function for all event types starting
+        with prefix, e.g. EVENT_ORDER for order events of every vt_orderid.
+        Handler is called only once for an event even if matched by
+        several prefixes.
+        """
+        with self._dispatch_lock:
+            handler_list: list = self._prefix_handlers.setdefault(prefix, [])
+            if handler not in handler_list:
+                handler_list.append(handler)
+
+            self._dispatch = {}
+
+    def unregister_prefix(self, prefix: str, handler: HandlerType) -> None:
+        """
+        Unregister an existing prefix handler function.
+        """
+        with self._dispatch_lock:
+            handler_list: list = self._prefix_handlers.get(prefix, [])
+
+            if handler in handler_list:
+                handler_list.remove(handler)
+
+            if not handler_list:
+                self._prefix_handlers.pop(prefix, None)
+
+            self._dispatch = {}
+
+    def register_filter(
+        self,
+        type: str,
+        handler: HandlerType,
+        keys: Iterable[Hashable],
+        name: str = "vt_symbol"
+    ) -> None:
+        """
+        Register a new handler function for a specific event type, which
+        is called only if attribute name of event data is in keys, e.g.
+        ticks of some vt_symbols, or orders of a gateway_name.
+
+        Registering the same handler again with the same attribute name
+        adds more keys.
+        """
+        with self._dispatch_lock:
+            table: Dict[Hashable, list] = (
+                self._filter_handlers.setdefault(type, {}).setdefault(name, {})
+            )
+
+            for key in keys:
+                handler_list: list = table.setdefault(key, [])
+                if handler not in handler_list:
+                    handler_list.append(handler)
+
+            self._dispatch = {}
+
+    def unregister_filter(
+        self,
+        type: str,
+        handler: HandlerType,
+        keys: Iterable[Hashable] = None,
+        name: str = "vt_symbol"
+    ) -> None:
+        """
+        Unregister an existing filtered handler function for keys, or
+        for all keys if not specified.
+        """
+        with self._dispatch_lock:
+            tables: Dict[str, Dict[Hashable, list]] = self._filter_handlers.get(type, {})
+            table: Dict[Hashable, list] = tables.get(name, {})
+
+            if keys is None:
+                keys = list(table.keys())
+
+            for key in keys:
+                handler_list: list = table.get(key, [])
+
+                if handler in handler_list:
+                    handler_list.remove(handler)
+
+                if not handler_list:
+                    table.pop(key, None)
+
+            if not table:
+                tables.pop(name, None)
+            if not tables:
+                self._filter_handlers.pop(type, None)
+
+            self._dispatch = {}
+
+
+# Defines function for getting shard key of event.
+KeyFuncType: callable = Callable[[Event], Optional[Hashable]]
+
+
+def get_shard_key(event: Event) -> Optional[Hashable]:
+    """
+    Get default shard key of event: vt_symbol of event data if exists,
+    otherwise gateway_name, otherwise None.
+    """
+    data: Any = event.data
+
+    key: Optional[str] = getattr(data, "vt_symbol", None)
+    if key is None:
+        key = getattr(data, "gateway_name", None)
+    return key
+
+
+class ShardedEventEngine(EventEngine):
+    """
+    Event engine which processes events with several worker threads.
+
+    Every event is routed to a worker by its shard key, so events with
+    the same key are processed in order by the same worker, while events
+    with different keys can be processed in parallel.
+
+    Events without shard key (e.g. timer event) go to the first worker.
+    Handlers registered may be called from different worker threads
+    concurrently, so any state shared between keys should be protected.
+    """
+
+    def __init__(
+        self,
+        interval: int = 1,
+        worker_count: int = 4,
+        key_funcs: Dict[str, KeyFuncType] = None,
+        **kwargs
+    ) -> None:
+        """
+        The shard key of each event type can be customized by key_funcs,
+        e.g. {EVENT_ORDER: lambda event: event.data.gateway_name}. Other
+        event types use get_shard_key.
+
+        Other keyword arguments are passed to EventEngine and applied
+        to the queue of every worker.
+        """
+        self._worker_count: int = worker_count
+        self._key_funcs: Dict[str, KeyFuncType] = key_funcs or {}
+
+        super().__init__(interval, **kwargs)
+
+        for _ in range(worker_count - 1):
+            queue: Queue = self._create_queue()
+            self._queues.append(queue)
+            self._threads.append(self._create_thread(queue))
+
+    def put(self, event: Event) -> None:
+        """
+        Put an event object into the queue of worker by its shard key.
+        """
+        key_func: KeyFuncType = self._key_funcs.get(event.type, get_shard_key)
+        key: Optional[Hashable] = key_func(event)
+
+        if key is None:
+            queue: Queue = self._queue
+        else:
+            queue: Queue = self._queues[hash(key) % self._worker_count]
+
+        self._put_queue(queue, event)
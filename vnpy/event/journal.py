@@ -0,0 +1,233 @@
+"""
+Binary journal for recording and replaying events.
+"""
+
+import mmap
+import pickle
+from pathlib import Path
+from struct import Struct
+from threading import Lock
+from time import perf_counter, sleep, time_ns
+from typing import Any, Callable, Iterator, Optional, Sequence, Tuple, Union
+
+from .engine import Event, EventEngine, EVENT_SCHEDULE, EVENT_TIMER
+
+
+JOURNAL_MAGIC: bytes = b"VNJOURNL"
+JOURNAL_VERSION: int = 1
+
+# File header: magic, version
+FILE_HEADER: Struct = Struct("<8sH6x")
+
+# Record header: record size (header included), timestamp in ns, type length
+RECORD_HEADER: Struct = Struct("<IqH")
+
+
+def pickle_dumps(data: Any) -> bytes:
+    """
+    Default serializer of event data.
+    """
+    return pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+
+
+class JournalWriter:
+    """
+    Append-only writer of events into a memory-mapped journal file.
+
+    The file is grown by chunk_size each time space runs out, and
+    truncated to the actual size when closed. Zero record size marks
+    the end of journal, so the file can also be read while writing
+    or after a crash.
+
+    Event data is serialized by dumps (pickle by default). Events with
+    data failed to be serialized are skipped and counted in error_count.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        chunk_size: int = 64 * 1024 * 1024,
+        dumps: Callable[[Any], bytes] = pickle_dumps,
+        exclude_types: Sequence[str] = (EVENT_SCHEDULE, EVENT_TIMER)
+    ) -> None:
+        """
+        A new journal file is created at path, overwriting existing one.
+        Scheduled callbacks are excluded by default since they are not
+        serializable, and so are timer events which are generated again
+        by event engine when replayed.
+        """
+        self.chunk_size: int = chunk_size
+        self.dumps: Callable[[Any], bytes] = dumps
+        self.exclude_types: set = set(exclude_types)
+
+        self.count: int = 0
+        self.error_count: int = 0
+
+        self.lock: Lock = Lock()
+
+        self.file = open(path, "w+b")
+        self.mm: Optional[mmap.mmap] = None
+        self.size: int = 0
+        self.offset: int = FILE_HEADER.size
+
+        self.grow(chunk_size)
+        FILE_HEADER.pack_into(self.mm, 0, JOURNAL_MAGIC, JOURNAL_VERSION)
+
+    def grow(self, size: int) -> None:
+        """
+        Grow file and memory map by at least size bytes.
+        """
+        new_size: int = self.size + max(self.chunk_size, size)
+
+        if self.mm:
+            self.mm.close()
+
+        self.file.truncate(new_size)
+        self.mm = mmap.mmap(self.file.fileno(), new_size)
+        self.size = new_size
+
+    def write(self, event: Event) -> None:
+        """
+        Append event into journal, thread-safe.
+        """
+        if event.type in self.exclude_types:
+            return
+
+        try:
+            payload: bytes = self.dumps(event.data)
+        except Exception:
+            self.error_count += 1
+            return
+
+        type_bytes: bytes = event.type.encode("utf-8")
+        record_size: int = RECORD_HEADER.size + len(type_bytes) + len(payload)
+
+        with self.lock:
+            if not self.mm:
+                return
+
+            # Always leave space for the zero end mark
+            if self.offset + record_size + RECORD_HEADER.size > self.size:
+                self.grow(record_size + RECORD_HEADER.size)
+
+            offset: int = self.offset
+            RECORD_HEADER.pack_into(self.mm, offset, record_size, time_ns(), len(type_bytes))
+
+            offset += RECORD_HEADER.size
+            self.mm[offset:offset + len(type_bytes)] = type_bytes
+
+            offset += len(type_bytes)
+            self.mm[offset:offset + len(payload)] = payload
+
+            self.offset += record_size
+            self.count += 1
+
+    def flush(self) -> None:
+        """
+        Flush journal data into disk.
+        """
+        with self.lock:
+            if self.mm:
+                self.mm.flush()
+
+    def close(self) -> None:
+        """
+        Close journal file with size truncated to data written.
+        """
+        with self.lock:
+            if not self.mm:
+                return
+
+            self.mm.flush()
+            self.mm.close()
+            self.mm = None
+
+            self.file.truncate(self.offset)
+            self.file.close()
+
+
+class JournalReader:
+    """
+    Reader of events recorded in journal file.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        loads: Callable[[bytes], Any] = pickle.loads
+    ) -> None:
+        """"""
+        self.path: Path = Path(path)
+        self.loads: Callable[[bytes], Any] = loads
+
+    def __iter__(self) -> Iterator[Tuple[int, Event]]:
+        """
+        Iterate (timestamp in ns, event) of all records in order.
+        """
+        with open(self.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                magic, version = FILE_HEADER.unpack_from(mm, 0)
+                if magic != JOURNAL_MAGIC:
+                    raise ValueError(f"Invalid journal file: {self.path}")
+
+                end: int = len(mm)
+                offset: int = FILE_HEADER.size
+
+                while offset + RECORD_HEADER.size <= end:
+                    record_size, timestamp, type_size = RECORD_HEADER.unpack_from(mm, offset)
+                    if not record_size or offset + record_size > end:
+                        break
+
+                    start: int = offset + RECORD_HEADER.size
+                    type: str = mm[start:start + type_size].decode("utf-8")
+                    payload: bytes = mm[start + type_size:offset + record_size]
+
+                    yield timestamp, Event(type, self.loads(payload))
+
+                    offset += record_size
+
+
+def replay_journal(
+    path: Union[str, Path],
+    event_engine: EventEngine,
+    speed: float = 0,
+    types: Sequence[str] = None,
+    loads: Callable[[bytes], Any] = pickle.loads
+) -> int:
+    """
+    Put events recorded in journal into event engine in the same order.
+
+    If speed is 0, events are put as fast as possible. Otherwise events
+    are put following the recorded wall-clock timestamps scaled by speed,
+    e.g. 10 means ten times faster than real time.
+
+    If types is given, only events of these types (matched by prefix)
+    are replayed. Timer events are always skipped, since event engine
+    generates its own. Return number of events replayed.
+    """
+    if types:
+        prefixes: Tuple[str, ...] = tuple(types)
+
+    count: int = 0
+    first_timestamp: int = 0
+    start: float = perf_counter()
+
+    for timestamp, event in JournalReader(path, loads):
+        if event.type == EVENT_TIMER:
+            continue
+        if types and not event.type.startswith(prefixes):
+            continue
+
+        if speed > 0:
+            if not first_timestamp:
+                first_timestamp = timestamp
+
+            target: float = start + (timestamp - first_timestamp) / 1e9 / speed
+            delay: float = target - perf_counter()
+            if delay > 0:
+                sleep(delay)
+
+        event_engine.put(event)
+        count += 1
+
+    return count
@@ -0,0 +1,177 @@
+"""
+Profiling of event processing in event engine.
+"""
+
+from collections import defaultdict
+from threading import Lock
+from typing import Any, Callable, Dict, List, Tuple
+
+
+# Latency histogram uses log2 buckets in microseconds: bucket 0 contains
+# latency below 1us, bucket n contains latency in [2^(n-1), 2^n) us.
+BUCKET_COUNT: int = 32
+
+
+class LatencyStats:
+    """
+    Call count, total time and latency histogram of a series of calls.
+    """
+
+    def __init__(self) -> None:
+        """"""
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+        self.buckets: List[int] = [0] * BUCKET_COUNT
+
+    def add(self, latency: float) -> None:
+        """
+        Add latency (seconds) of one call.
+        """
+        self.count += 1
+        self.total += latency
+
+        if latency > self.max:
+            self.max = latency
+
+        index: int = min(int(latency * 1_000_000).bit_length(), BUCKET_COUNT - 1)
+        self.buckets[index] += 1
+
+    def percentile(self, percent: float) -> float:
+        """
+        Estimate latency (seconds) of percentile from histogram, with
+        the upper bound of bucket the percentile falls into.
+        """
+        if not self.count:
+            return 0
+
+        target: float = self.count * percent / 100
+        accumulated: int = 0
+
+        for index, count in enumerate(self.buckets):
+            accumulated += count
+            if accumulated >= target:
+                break
+
+        upper: float = (1 << index) / 1_000_000
+        return min(upper, self.max)
+
+    def get_data(self) -> Dict[str, float]:
+        """
+        Get statistics in dict.
+        """
+        if self.count:
+            mean: float = self.total / self.count
+        else:
+            mean: float = 0
+
+        data: Dict[str, float] = {
+            "count": self.count,
+            "total": self.total,
+            "mean": mean,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": self.max
+        }
+        return data
+
+
+def get_handler_name(handler: Callable) -> str:
+    """
+    Get readable name of handler function.
+    """
+    return getattr(handler, "__qualname__", None) or repr(handler)
+
+
+class EventProfiler:
+    """
+    Records processing time of each handler registered in event engine,
+    as well as queue depth and waiting time of events in queue.
+    """
+
+    def __init__(self) -> None:
+        """"""
+        self.handler_stats: Dict[Tuple[str, Callable], LatencyStats] = defaultdict(LatencyStats)
+        self.wait_stats: Dict[str, LatencyStats] = defaultdict(LatencyStats)
+
+        self.queue_size: int = 0
+        self.max_queue_size: int = 0
+
+        self.lock: Lock = Lock()
+
+    def record_queue_size(self, queue_size: int) -> None:
+        """
+        Record queue size when putting event into queue.
+        """
+        self.queue_size = queue_size
+        if queue_size > self.max_queue_size:
+            self.max_queue_size = queue_size
+
+    def record_wait(self, type: str, latency: float) -> None:
+        """
+        Record time of event waiting in queue.
+        """
+        with self.lock:
+            self.wait_stats[type].add(latency)
+
+    def record_handler(self, type: str, handler: Callable, latency: float) -> None:
+        """
+        Record time of handler processing event.
+        """
+        with self.lock:
+            self.handler_stats[(type, handler)].add(latency)
+
+    def get_handler_stats(self) -> List[Dict[str, Any]]:
+        """
+        Get statistics of all handlers, sorted by total time descending.
+        """
+        with self.lock:
+            items: list = list(self.handler_stats.items())
+
+        results: List[Dict[str, Any]] = []
+        for (type, handler), stats in items:
+            data: Dict[str, Any] = stats.get_data()
+            data["type"] = type
+            data["handler"] = get_handler_name(handler)
+            results.append(data)
+
+        results.sort(key=lambda d: d["total"], reverse=True)
+        return results
+
+    def get_wait_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get statistics of queue waiting time by event type.
+        """
+        with self.lock:
+            items: list = list(self.wait_stats.items())
+
+        return {type: stats.get_data() for type, stats in items}
+
+    def get_summary(self, count: int = 10) -> str:
+        """
+        Get text summary of queue and the most time-consuming handlers.
+        """
+        lines: List[str] = [
+            f"Queue size: {self.queue_size}, max: {self.max_queue_size}"
+        ]
+
+        for data in self.get_handler_stats()[:count]:
+            lines.append(
+                f"{data['handler']} [{data['type']}] "
+                f"count: {data['count']}, total: {data['total']:.3f}s, "
+                f"p50: {data['p50'] * 1000:.3f}ms, p99: {data['p99'] * 1000:.3f}ms, "
+                f"max: {data['max'] * 1000:.3f}ms"
+            )
+
+        return "\n".join(lines)
+
+    def clear(self) -> None:
+        """
+        Clear all statistics recorded.
+        """
+        with self.lock:
+            self.handler_stats.clear()
+            self.wait_stats.clear()
+
+        self.queue_size = 0
+        self.max_queue_size = 0
@@ -0,0 +1,304 @@
+"""
+Shared-memory event bus for distributing events across processes.
+"""
+
+import os
+import pickle
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from struct import Struct
+from threading import Lock, Thread
+from time import sleep
+from typing import Any, Callable, List, Sequence
+
+from .engine import Event, EventEngine
+from .journal import pickle_dumps
+
+
+BUS_MAGIC: bytes = b"VNSHMBUS"
+
+# Bus header: magic, capacity, reserve position, commit position
+BUS_HEADER: Struct = Struct("<8sQQQ")
+HEADER_SIZE: int = 64
+RESERVE_OFFSET: int = 16
+COMMIT_OFFSET: int = 24
+
+POSITION: Struct = Struct("<Q")
+
+# Record header: record size (header included), type length.
+# Zero record size marks the rest of buffer is skipped.
+RECORD_HEADER: Struct = Struct("<IH")
+
+
+def untrack(shm: SharedMemory) -> None:
+    """
+    Stop resource tracker from removing shared memory when current process
+    exits, since lifetime of the bus is managed by publisher explicitly.
+    """
+    if os.name == "posix":
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+
+def track(shm: SharedMemory) -> None:
+    """
+    Register shared memory into resource tracker again before unlinking.
+    """
+    if os.name == "posix":
+        resource_tracker.register(shm._name, "shared_memory")
+
+
+class SharedEventPublisher:
+    """
+    Publishes events of selected types from event engine into a ring
+    buffer in shared memory, which can be read by SharedEventSubscriber
+    in any number of processes on the same host.
+
+    Positions in ring buffer are absolute byte counts which only grow.
+    Before writing a record, the publisher moves reserve position to the
+    end of the record, and after writing it moves commit position. So a
+    subscriber can tell whether the record it just copied could have
+    been overwritten by comparing its position with reserve position.
+
+    The publisher never waits for subscribers: a subscriber lagging more
+    than capacity skips to the latest position and loses events, which
+    is counted in its lost_count.
+    """
+
+    def __init__(
+        self,
+        event_engine: EventEngine,
+        name: str,
+        types: Sequence[str],
+        capacity: int = 64 * 1024 * 1024,
+        dumps: Callable[[Any], bytes] = pickle_dumps
+    ) -> None:
+        """
+        Create shared memory with name, and register handlers for types.
+
+        Shared memory left by a publisher crashed with the same name is
+        removed and created again.
+        """
+        self.event_engine: EventEngine = event_engine
+        self.types: List[str] = list(types)
+        self.capacity: int = capacity
+        self.dumps: Callable[[Any], bytes] = dumps
+
+        size: int = HEADER_SIZE + capacity
+        try:
+            self.shm: SharedMemory = SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            stale: SharedMemory = SharedMemory(name)
+            stale.close()
+            stale.unlink()
+
+            self.shm: SharedMemory = SharedMemory(name, create=True, size=size)
+
+        untrack(self.shm)
+
+        self.buf: memoryview = self.shm.buf
+        BUS_HEADER.pack_into(self.buf, 0, BUS_MAGIC, capacity, 0, 0)
+
+        self.position: int = 0
+        self.count: int = 0
+        self.error_count: int = 0
+        self.lock: Lock = Lock()
+
+        for type in self.types:
+            self.event_engine.register(type, self.publish)
+
+    def publish(self, event: Event) -> None:
+        """
+        Write event into ring buffer.
+        """
+        try:
+            payload: bytes = self.dumps(event.data)
+        except Exception:
+            self.error_count += 1
+            return
+
+        type_bytes: bytes = event.type.encode("utf-8")
+        size: int = RECORD_HEADER.size + len(type_bytes) + len(payload)
+
+        if size > self.capacity:
+            self.error_count += 1
+            return
+
+        with self.lock:
+            if not self.buf:
+                return
+
+            position: int = self.position
+            offset: int = position % self.capacity
+
+            # Skip the rest of buffer if record cannot fit in
+            remaining: int = self.capacity - offset
+            if remaining < size:
+                POSITION.pack_into(self.buf, RESERVE_OFFSET, position + remaining + size)
+                if remaining >= RECORD_HEADER.size:
+                    RECORD_HEADER.pack_into(self.buf, HEADER_SIZE + offset, 0, 0)
+
+                position += remaining
+                offset = 0
+            else:
+                POSITION.pack_into(self.buf, RESERVE_OFFSET, position + size)
+
+            start: int = HEADER_SIZE + offset
+            RECORD_HEADER.pack_into(self.buf, start, size, len(type_bytes))
+
+            start += RECORD_HEADER.size
+            self.buf[start:start + len(type_bytes)] = type_bytes
+
+            start += len(type_bytes)
+            self.buf[start:start + len(payload)] = payload
+
+            self.position = position + size
+            POSITION.pack_into(self.buf, COMMIT_OFFSET, self.position)
+
+            self.count += 1
+
+    def close(self) -> None:
+        """
+        Unregister handlers, then close and remove shared memory.
+        """
+        for type in self.types:
+            self.event_engine.unregister(type, self.publish)
+
+        with self.lock:
+            self.buf = None
+            self.shm.close()
+
+            track(self.shm)
+            self.shm.unlink()
+
+
+class SharedEventSubscriber:
+    """
+    Reads events published by SharedEventPublisher from shared memory,
+    and puts them into event engine of current process as normal events.
+
+    Only events published after the subscriber attached are received.
+    """
+
+    def __init__(
+        self,
+        event_engine: EventEngine,
+        name: str,
+        loads: Callable[[bytes], Any] = pickle.loads,
+        poll_interval: float = 0.001
+    ) -> None:
+        """
+        Attach to shared memory created by publisher with name.
+        """
+        self.event_engine: EventEngine = event_engine
+        self.loads: Callable[[bytes], Any] = loads
+        self.poll_interval: float = poll_interval
+
+        self.shm: SharedMemory = SharedMemory(name)
+        untrack(self.shm)
+
+        self.buf: memoryview = self.shm.buf
+
+        magic, self.capacity, _, _ = BUS_HEADER.unpack_from(self.buf, 0)
+        if magic != BUS_MAGIC:
+            raise ValueError(f"Invalid shared event bus: {name}")
+
+        self.position: int = self.read_position(COMMIT_OFFSET)
+        self.count: int = 0
+        self.lost_count: int = 0
+
+        self.active: bool = False
+        self.thread: Thread = Thread(target=self.run, daemon=True)
+
+    def read_position(self, offset: int) -> int:
+        """
+        Read position from header, retried until two reads are the same
+        in case of torn read while publisher writing.
+        """
+        while True:
+            position: int = POSITION.unpack_from(self.buf, offset)[0]
+            if position == POSITION.unpack_from(self.buf, offset)[0]:
+                return position
+
+    def poll(self) -> int:
+        """
+        Read all events committed since last poll and put them into
+        event engine. Return number of events read.
+        """
+        count: int = 0
+        commit: int = self.read_position(COMMIT_OFFSET)
+
+        while self.position < commit:
+            # Lapped by publisher, so skip to latest position
+            if commit - self.position > self.capacity:
+                self.lost_count += 1
+                self.position = commit
+                break
+
+            offset: int = self.position % self.capacity
+            remaining: int = self.capacity - offset
+
+            if remaining < RECORD_HEADER.size:
+                self.position += remaining
+                continue
+
+            start: int = HEADER_SIZE + offset
+            size, type_size = RECORD_HEADER.unpack_from(self.buf, start)
+
+            if not size:
+                self.position += remaining
+                continue
+
+            valid: bool = RECORD_HEADER.size + type_size <= size <= remaining
+            if valid:
+                record: bytes = bytes(self.buf[start:start + size])
+
+            # Record may be overwritten during copy
+            reserve: int = self.read_position(RESERVE_OFFSET)
+            if not valid or reserve - self.position > self.capacity:
+                self.lost_count += 1
+                self.position = self.read_position(COMMIT_OFFSET)
+                break
+
+            type_end: int = RECORD_HEADER.size + type_size
+            type: str = record[RECORD_HEADER.size:type_end].decode("utf-8")
+            data: Any = self.loads(record[type_end:])
+
+            self.event_engine.put(Event(type, data))
+
+            self.position += size
+            count += 1
+
+        self.count += count
+        return count
+
+    def run(self) -> None:
+        """
+        Poll shared memory until stopped.
+        """
+        while self.active:
+            if not self.poll():
+                sleep(self.poll_interval)
+
+    def start(self) -> None:
+        """
+        Start polling thread.
+        """
+        self.active = True
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop polling thread.
+        """
+        self.active = False
+        self.thread.join()
+
+    def close(self) -> None:
+        """
+        Stop polling and detach from shared memory.
+        """
+        if self.active:
+            self.stop()
+
+        self.buf = None
+        self.shm.close()
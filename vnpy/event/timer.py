@@ -0,0 +1,219 @@
+"""
+Timer wheel for scheduling callbacks in event engine.
+"""
+
+from heapq import heappop, heappush
+from itertools import count
+from math import ceil, floor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# Tolerance for converting float time into ticks
+EPSILON: float = 1e-9
+
+
+class Timer:
+    """
+    Callback scheduled to be called at deadline tick, and then every
+    interval ticks if interval is positive.
+    """
+
+    def __init__(
+        self,
+        timer_id: int,
+        callback: Callable[[], None],
+        deadline: int,
+        interval: int
+    ) -> None:
+        """"""
+        self.timer_id: int = timer_id
+        self.callback: Callable[[], None] = callback
+        self.deadline: int = deadline
+        self.interval: int = interval
+        self.active: bool = True
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel, with each slot containing timers whose deadline
+    tick falls into it (modulo slot count).
+
+    Time passed in is in seconds (of any monotonic clock), and converted
+    into ticks by resolution. Deadlines of periodic timers are always
+    advanced by interval from last deadline rather than from the time
+    it fired, so there's no drift accumulated.
+
+    The earliest deadline is tracked by a heap of (deadline, timer_id),
+    whose entries of cancelled or rescheduled timers are removed lazily
+    when they reach the top.
+
+    The wheel itself is not thread-safe, which should be protected by
+    caller.
+    """
+
+    def __init__(self, resolution: float = 0.001, slot_count: int = 1024) -> None:
+        """"""
+        self.resolution: float = resolution
+        self.slot_count: int = slot_count
+
+        self.slots: List[List[Timer]] = [[] for _ in range(slot_count)]
+        self.timers: Dict[int, Timer] = {}
+
+        self.tick: Optional[int] = None
+        self.next_deadline: Optional[int] = None
+        self.deadlines: List[Tuple[int, int]] = []
+
+        self.timer_ids: Iterator[int] = count(1)
+
+    def add(
+        self,
+        callback: Callable[[], None],
+        delay: float,
+        interval: float,
+        now: float
+    ) -> Timer:
+        """
+        Add a timer which expires after delay seconds from now, and then
+        every interval seconds if interval is positive.
+        """
+        if self.tick is None:
+            self.tick = self.get_tick(now)
+
+        deadline: int = max(ceil((now + delay) / self.resolution - EPSILON), self.tick + 1)
+
+        if interval > 0:
+            interval_ticks: int = max(round(interval / self.resolution), 1)
+        else:
+            interval_ticks: int = 0
+
+        timer: Timer = Timer(next(self.timer_ids), callback, deadline, interval_ticks)
+        self.timers[timer.timer_id] = timer
+        self.insert(timer)
+
+        return timer
+
+    def cancel(self, timer_id: int) -> bool:
+        """
+        Cancel a timer, which is removed from slot lazily.
+
+        Return False if timer not found (already expired if not periodic).
+        """
+        timer: Optional[Timer] = self.timers.pop(timer_id, None)
+        if not timer:
+            return False
+
+        timer.active = False
+        self.update_next_deadline()
+        return True
+
+    def insert(self, timer: Timer) -> None:
+        """
+        Insert timer into slot of its deadline.
+        """
+        self.slots[timer.deadline % self.slot_count].append(timer)
+        heappush(self.deadlines, (timer.deadline, timer.timer_id))
+
+        if self.next_deadline is None or timer.deadline < self.next_deadline:
+            self.next_deadline = timer.deadline
+
+    def rebase(self, now: float) -> None:
+        """
+        Move wheel to now without expiring any timer, with deadlines of
+        all timers shifted by the same offset, e.g. when timers are added
+        before the clock starts.
+        """
+        target: int = self.get_tick(now)
+        offset: int = target - (self.tick or 0)
+
+        self.tick = target
+        self.slots = [[] for _ in range(self.slot_count)]
+        self.deadlines = []
+        self.next_deadline = None
+
+        for timer in self.timers.values():
+            timer.deadline += offset
+            self.insert(timer)
+
+    def advance(self, now: float) -> List[Timer]:
+        """
+        Move wheel forward to now, and return timers expired in order
+        of deadline.
+
+        Periodic timers which missed several intervals (e.g. when the
+        clock jumps forward) are returned only once.
+        """
+        target: int = self.get_tick(now)
+
+        if self.tick is None:
+            self.tick = target
+        if target <= self.tick:
+            return []
+
+        expired: List[Timer] = []
+
+        # Every slot only need to be visited once
+        steps: int = min(target - self.tick, self.slot_count)
+
+        for i in range(1, steps + 1):
+            slot: List[Timer] = self.slots[(self.tick + i) % self.slot_count]
+            if not slot:
+                continue
+
+            remaining: List[Timer] = []
+            for timer in slot:
+                if not timer.active:
+                    continue
+                elif timer.deadline <= target:
+                    expired.append(timer)
+                else:
+                    remaining.append(timer)
+            slot[:] = remaining
+
+        self.tick = target
+
+        expired.sort(key=lambda timer: timer.deadline)
+
+        for timer in expired:
+            if timer.interval:
+                missed: int = (target - timer.deadline) // timer.interval + 1
+                timer.deadline += missed * timer.interval
+                self.insert(timer)
+            else:
+                self.timers.pop(timer.timer_id, None)
+
+        self.update_next_deadline()
+
+        return expired
+
+    def update_next_deadline(self) -> None:
+        """
+        Update the earliest deadline of all active timers, dropping
+        stale entries from top of deadline heap.
+        """
+        deadlines: List[Tuple[int, int]] = self.deadlines
+
+        while deadlines:
+            deadline, timer_id = deadlines[0]
+
+            timer: Optional[Timer] = self.timers.get(timer_id, None)
+            if timer and timer.deadline == deadline:
+                self.next_deadline = deadline
+                return
+
+            heappop(deadlines)
+
+        self.next_deadline = None
+
+    def get_tick(self, now: float) -> int:
+        """
+        Convert time in seconds into tick.
+        """
+        return floor(now / self.resolution + EPSILON)
+
+    def get_next_time(self) -> Optional[float]:
+        """
+        Get time in seconds of the earliest deadline.
+        """
+        if self.next_deadline is None:
+            return None
+        return self.next_deadline * self.resolution
@@ -0,0 +1,130 @@
+"""
+On-disk archive of finished orders and trades, to bound memory of OMS.
+"""
+
+import sqlite3
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+from .codec import encode, decode
+from .object import OrderData, TradeData
+
+
+# Table name of each kind of data archived
+ARCHIVE_TABLES: List[str] = ["order_data", "trade_data"]
+
+
+class DataArchive:
+    """
+    Key-value store of data objects in SQLite, encoded with binary codec.
+
+    Saved objects are buffered in memory and written in batch, and loading
+    checks the buffer first, so that any saved object can be loaded back.
+
+    The archive only lasts for one session of trading, so it's cleared
+    when opened and written without journal or sync.
+    """
+
+    def __init__(self, file_path: str, buffer_size: int = 1000) -> None:
+        """"""
+        self.buffer_size: int = buffer_size
+        self.buffers: Dict[str, Dict[str, Any]] = {table: {} for table in ARCHIVE_TABLES}
+
+        # Loading may be called from other threads than the event thread
+        self.lock: Lock = Lock()
+
+        self.connection: sqlite3.Connection = sqlite3.connect(file_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode = OFF")
+        self.connection.execute("PRAGMA synchronous = OFF")
+
+        for table in ARCHIVE_TABLES:
+            self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+            self.connection.execute(
+                f"CREATE TABLE {table} (key TEXT PRIMARY KEY, data BLOB) WITHOUT ROWID"
+            )
+        self.connection.commit()
+
+    def save_order(self, order: OrderData) -> None:
+        """"""
+        self.save("order_data", order.vt_orderid, order)
+
+    def save_trade(self, trade: TradeData) -> None:
+        """"""
+        self.save("trade_data", trade.vt_tradeid, trade)
+
+    def load_order(self, vt_orderid: str) -> Optional[OrderData]:
+        """"""
+        return self.load("order_data", vt_orderid)
+
+    def load_trade(self, vt_tradeid: str) -> Optional[TradeData]:
+        """"""
+        return self.load("trade_data", vt_tradeid)
+
+    def save(self, table: str, key: str, data: Any) -> None:
+        """
+        Save data object into buffer, and write buffer into database
+        when full.
+        """
+        with self.lock:
+            buffer: Dict[str, Any] = self.buffers[table]
+            buffer[key] = data
+
+            if len(buffer) >= self.buffer_size:
+                self.write_buffer(table)
+
+    def load(self, table: str, key: str) -> Optional[Any]:
+        """
+        Load data object by key, return None if not found.
+        """
+        with self.lock:
+            data: Optional[Any] = self.buffers[table].get(key, None)
+            if data is not None:
+                return data
+
+            row: Optional[tuple] = self.connection.execute(
+                f"SELECT data FROM {table} WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return decode(row[0])
+
+    def get_count(self, table: str) -> int:
+        """
+        Get number of data objects saved into table.
+        """
+        with self.lock:
+            self.write_buffer(table)
+            return self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def write_buffer(self, table: str) -> None:
+        """
+        Write buffered data objects into database, should be called
+        with lock held.
+        """
+        buffer: Dict[str, Any] = self.buffers[table]
+        if not buffer:
+            return
+
+        self.connection.executemany(
+            f"INSERT OR REPLACE INTO {table} VALUES (?, ?)",
+            [(key, encode(data)) for key, data in buffer.items()]
+        )
+        self.connection.commit()
+
+        buffer.clear()
+
+    def flush(self) -> None:
+        """
+        Write all buffered data objects into database.
+        """
+        with self.lock:
+            for table in ARCHIVE_TABLES:
+                self.write_buffer(table)
+
+    def close(self) -> None:
+        """"""
+        self.flush()
+
+        with self.lock:
+            self.connection.close()
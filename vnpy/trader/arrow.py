@@ -0,0 +1,328 @@
+"""
+Conversion between bar/tick data and Apache Arrow tables.
+
+Arrow tables can be passed on to Polars (polars.from_arrow) or pandas
+(Table.to_pandas) for analysis without looping over data objects again.
+RecordBatch is accepted wherever a Table is expected, and a Table can be
+split into record batches with Table.to_batches.
+
+pyarrow is an optional dependency, install with: pip install vnpy[arrow]
+"""
+
+from datetime import datetime, timedelta, timezone, tzinfo
+from enum import Enum
+from typing import Dict, List, Optional, Sequence, Type, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .batch import DATETIME_DTYPE, BaseBatch, BarBatch, TickBatch
+from .constant import Exchange, Interval
+from .object import BarData, TickData
+from .utility import ZoneInfo
+
+
+ArrowData = Union[pa.Table, pa.RecordBatch]
+
+# Enum type of meta columns stored as value string
+ENUM_FIELDS: Dict[str, Type[Enum]] = {
+    "exchange": Exchange,
+    "interval": Interval,
+}
+
+# Meta columns are dictionary encoded, as they mostly repeat the same value
+META_TYPE: pa.DataType = pa.dictionary(pa.int32(), pa.string())
+
+
+def get_tz_name(tz: Optional[tzinfo]) -> Optional[str]:
+    """
+    Get timezone name used by Arrow, either IANA key or fixed offset.
+    """
+    if tz is None:
+        return None
+
+    key: Optional[str] = getattr(tz, "key", None)
+    if key:
+        return key
+
+    offset: timedelta = tz.utcoffset(None)
+    minutes: int = int(offset.total_seconds()) // 60
+    sign: str = "-" if minutes < 0 else "+"
+    hours, minutes = divmod(abs(minutes), 60)
+    return f"{sign}{hours:02d}:{minutes:02d}"
+
+
+def get_tz_info(name: Optional[str]) -> Optional[tzinfo]:
+    """
+    Get timezone of Arrow timezone name.
+    """
+    if not name:
+        return None
+
+    if name[0] in "+-":
+        hours, minutes = name[1:].split(":")
+        offset: timedelta = timedelta(hours=int(hours), minutes=int(minutes))
+        if name[0] == "-":
+            offset = -offset
+        return timezone(offset)
+
+    return ZoneInfo(name)
+
+
+def to_table(data: ArrowData) -> pa.Table:
+    """"""
+    if isinstance(data, pa.RecordBatch):
+        return pa.Table.from_batches([data])
+    return data
+
+
+def create_timestamp_array(values: np.ndarray, tz: Optional[tzinfo]) -> pa.Array:
+    """
+    Create Arrow timestamp array of wall-clock datetime64 values.
+    """
+    array: pa.Array = pa.array(values.astype(DATETIME_DTYPE, copy=False), from_pandas=True)
+    if tz is None:
+        return array
+
+    return pc.assume_timezone(
+        array,
+        get_tz_name(tz),
+        ambiguous="earliest",
+        nonexistent="earliest"
+    )
+
+
+def get_wall_clock(column: pa.ChunkedArray) -> np.ndarray:
+    """
+    Get wall-clock datetime64 values of Arrow timestamp column.
+    """
+    if column.type.tz:
+        column = pc.local_timestamp(column)
+    return column.cast(pa.timestamp("us")).to_numpy()
+
+
+def create_meta_array(value: Union[str, Enum, None], count: int) -> pa.Array:
+    """
+    Create array repeating the same meta value without copying it.
+    """
+    if value is None:
+        return pa.nulls(count, META_TYPE)
+
+    if isinstance(value, Enum):
+        value = value.value
+
+    indices: pa.Array = pa.array(np.zeros(count, dtype=np.int32))
+    return pa.DictionaryArray.from_arrays(indices, pa.array([value], pa.string()))
+
+
+def get_meta_values(table: pa.Table, name: str) -> list:
+    """
+    Get meta column as list, with enum fields converted.
+    """
+    values: list = table.column(name).to_pylist()
+
+    enum_type: Optional[Type[Enum]] = ENUM_FIELDS.get(name, None)
+    if enum_type:
+        members: dict = {value: enum_type(value) for value in set(values) if value is not None}
+        members[None] = None
+        values = [members[value] for value in values]
+
+    return values
+
+
+def get_meta_names(batch_class: Type[BaseBatch]) -> List[str]:
+    """"""
+    return [name for name in batch_class.meta_fields if name != "vt_symbol"]
+
+
+def objects_to_arrow(objects: Sequence[Union[BarData, TickData]], batch_class: Type[BaseBatch]) -> pa.Table:
+    """
+    Convert list of data objects into Arrow table. Objects can be of
+    different symbols.
+    """
+    names: List[str] = []
+    arrays: List[pa.Array] = []
+
+    for name in get_meta_names(batch_class):
+        values: list = [getattr(obj, name) for obj in objects]
+        if name in ENUM_FIELDS:
+            values = [value.value if value else None for value in values]
+
+        names.append(name)
+        arrays.append(pa.array(values, pa.string()).dictionary_encode())
+
+    for name in batch_class.datetime_fields:
+        dts: list = [getattr(obj, name) for obj in objects]
+        first: Optional[datetime] = next((dt for dt in dts if dt), None)
+        tz: Optional[tzinfo] = first.tzinfo if first else None
+
+        # Aware datetime is converted into UTC by Arrow directly
+        names.append(name)
+        arrays.append(pa.array(dts, pa.timestamp("us", tz=get_tz_name(tz))))
+
+    for name in batch_class.float_fields:
+        names.append(name)
+        arrays.append(pa.array([getattr(obj, name) for obj in objects], pa.float64()))
+
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def arrow_to_objects(data: ArrowData, batch_class: Type[BaseBatch]) -> List[Union[BarData, TickData]]:
+    """
+    Convert Arrow table into list of data objects.
+    """
+    table: pa.Table = to_table(data)
+
+    names: List[str] = []
+    columns: List[list] = []
+
+    for name in get_meta_names(batch_class):
+        names.append(name)
+        columns.append(get_meta_values(table, name))
+
+    for name in batch_class.datetime_fields:
+        column: pa.ChunkedArray = table.column(name)
+        tz: Optional[tzinfo] = get_tz_info(column.type.tz)
+
+        names.append(name)
+        columns.append([
+            dt.replace(tzinfo=tz) if dt else None
+            for dt in get_wall_clock(column).astype(object)
+        ])
+
+    for name in batch_class.float_fields:
+        names.append(name)
+        columns.append(table.column(name).to_numpy().tolist())
+
+    data_class: type = batch_class.data_class
+    return [data_class(**dict(zip(names, values))) for values in zip(*columns)]
+
+
+def batch_to_arrow(batch: BaseBatch) -> pa.Table:
+    """
+    Convert bar or tick batch into Arrow table, copying each column of
+    the structured array once.
+    """
+    count: int = len(batch)
+
+    names: List[str] = []
+    arrays: List[pa.Array] = []
+
+    for name in get_meta_names(batch.__class__):
+        names.append(name)
+        arrays.append(create_meta_array(getattr(batch, name), count))
+
+    for name in batch.datetime_fields:
+        names.append(name)
+        arrays.append(create_timestamp_array(batch.data[name], batch.tz))
+
+    for name in batch.float_fields:
+        names.append(name)
+        arrays.append(pa.array(batch.data[name]))
+
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def arrow_to_batch(data: ArrowData, batch_class: Type[BaseBatch]) -> BaseBatch:
+    """
+    Convert Arrow table of a single symbol into bar or tick batch.
+    """
+    table: pa.Table = to_table(data)
+
+    if not table.num_rows:
+        return batch_class("", None)
+
+    params: dict = {}
+    for name in get_meta_names(batch_class):
+        column: pa.ChunkedArray = table.column(name)
+        if len(pc.unique(column)) > 1:
+            raise ValueError(f"Column {name} has more than one value, which is not allowed in batch")
+
+        value: Optional[str] = column[0].as_py()
+        enum_type: Optional[Type[Enum]] = ENUM_FIELDS.get(name, None)
+        if enum_type and value is not None:
+            value = enum_type(value)
+        params[name] = value
+
+    array: np.ndarray = np.empty(table.num_rows, dtype=batch_class.get_dtype())
+
+    for name in batch_class.datetime_fields:
+        array[name] = get_wall_clock(table.column(name))
+
+    for name in batch_class.float_fields:
+        array[name] = table.column(name).to_numpy()
+
+    tz: Optional[tzinfo] = get_tz_info(table.column("datetime").type.tz)
+    return batch_class(data=array, tz=tz, **params)
+
+
+def bars_to_arrow(bars: Sequence[BarData]) -> pa.Table:
+    """
+    Convert list of bar data into Arrow table.
+    """
+    return objects_to_arrow(bars, BarBatch)
+
+
+def arrow_to_bars(data: ArrowData) -> List[BarData]:
+    """
+    Convert Arrow table into list of bar data.
+    """
+    return arrow_to_objects(data, BarBatch)
+
+
+def ticks_to_arrow(ticks: Sequence[TickData]) -> pa.Table:
+    """
+    Convert list of tick data into Arrow table.
+    """
+    return objects_to_arrow(ticks, TickBatch)
+
+
+def arrow_to_ticks(data: ArrowData) -> List[TickData]:
+    """
+    Convert Arrow table into list of tick data.
+    """
+    return arrow_to_objects(data, TickBatch)
+
+
+def arrow_to_bar_batch(data: ArrowData) -> BarBatch:
+    """
+    Convert Arrow table of a single symbol into bar batch.
+    """
+    return arrow_to_batch(data, BarBatch)
+
+
+def arrow_to_tick_batch(data: ArrowData) -> TickBatch:
+    """
+    Convert Arrow table of a single symbol into tick batch.
+    """
+    return arrow_to_batch(data, TickBatch)
+
+
+def to_numpy_columns(data: ArrowData, names: Sequence[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Get columns of Arrow table as NumPy arrays.
+
+    Numeric columns without null are returned as read-only views into
+    Arrow memory without copying, if stored in one chunk. Timestamp
+    columns are viewed as datetime64 in UTC. Other columns are copied.
+    """
+    table: pa.Table = to_table(data)
+    if names is None:
+        names = table.column_names
+
+    arrays: Dict[str, np.ndarray] = {}
+
+    for name in names:
+        column: pa.ChunkedArray = table.column(name)
+        if column.num_chunks == 1:
+            array: pa.Array = column.chunk(0)
+        else:
+            array: pa.Array = column.combine_chunks()
+
+        try:
+            arrays[name] = array.to_numpy(zero_copy_only=True)
+        except pa.ArrowInvalid:
+            arrays[name] = array.to_numpy(zero_copy_only=False)
+
+    return arrays
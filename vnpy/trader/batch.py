@@ -0,0 +1,487 @@
+"""
+Columnar containers of bar and tick data backed by NumPy structured arrays.
+"""
+
+from datetime import datetime, tzinfo
+from operator import attrgetter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .constant import Exchange, Interval
+from .object import BarData, TickData
+from .symbol import generate_vt_symbol
+
+
+# Datetime is stored as wall-clock time of batch timezone in microseconds
+DATETIME_DTYPE: str = "datetime64[us]"
+
+BAR_FIELDS: List[str] = [
+    "volume",
+    "turnover",
+    "open_interest",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+]
+
+TICK_FIELDS: List[str] = [
+    "volume",
+    "turnover",
+    "open_interest",
+    "last_price",
+    "last_volume",
+    "limit_up",
+    "limit_down",
+    "open_price",
+    "high_price",
+    "low_price",
+    "pre_close",
+    "bid_price_1",
+    "bid_price_2",
+    "bid_price_3",
+    "bid_price_4",
+    "bid_price_5",
+    "ask_price_1",
+    "ask_price_2",
+    "ask_price_3",
+    "ask_price_4",
+    "ask_price_5",
+    "bid_volume_1",
+    "bid_volume_2",
+    "bid_volume_3",
+    "bid_volume_4",
+    "bid_volume_5",
+    "ask_volume_1",
+    "ask_volume_2",
+    "ask_volume_3",
+    "ask_volume_4",
+    "ask_volume_5",
+]
+
+# Default columns kept in tick buffer, besides timestamp
+TICK_BUFFER_FIELDS: List[str] = [
+    "last_price",
+    "last_volume",
+    "volume",
+    "turnover",
+    "open_interest",
+    "bid_price_1",
+    "ask_price_1",
+    "bid_volume_1",
+    "ask_volume_1",
+]
+
+
+class BatchRow:
+    """
+    Lightweight read-only view of one row in batch, with the same
+    attribute names of data object.
+    """
+
+    __slots__ = ("batch", "record")
+
+    def __init__(self, batch: "BaseBatch", record: np.void) -> None:
+        """"""
+        self.batch: "BaseBatch" = batch
+        self.record: np.void = record
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Get column value of the row, or common value of the batch.
+        """
+        if name in self.batch.datetime_fields:
+            return self.batch.to_datetime(self.record[name])
+        elif name in self.batch.float_fields:
+            return self.record[name]
+        elif name in self.batch.meta_fields:
+            return getattr(self.batch, name)
+
+        raise AttributeError(name)
+
+    def to_data(self) -> Union[BarData, TickData]:
+        """
+        Create data object of the row.
+        """
+        return self.batch.create_data(self.record.item())
+
+    def __repr__(self) -> str:
+        """"""
+        return f"{self.__class__.__name__}({self.batch.vt_symbol}, {self.record})"
+
+
+class BaseBatch:
+    """
+    Column store of data with the same symbol, exchange and gateway,
+    e.g. data loaded from database.
+
+    Rows are stored in a NumPy structured array, with one datetime64
+    column for each datetime field and float64 columns for the others.
+    Datetime is stored as naive wall-clock time of batch timezone, which
+    is taken from the first data object when converted from list.
+
+    Slicing with index or time range returns a new batch sharing the
+    same memory without copying.
+    """
+
+    data_class: type = None
+    row_class: type = BatchRow
+
+    datetime_fields: Tuple[str, ...] = ("datetime",)
+    float_fields: Tuple[str, ...] = ()
+    meta_fields: Tuple[str, ...] = ("symbol", "exchange", "gateway_name", "vt_symbol")
+
+    def __init__(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        data: Optional[np.ndarray] = None,
+        gateway_name: str = "",
+        tz: Optional[tzinfo] = None
+    ) -> None:
+        """
+        If data is not given, an empty batch is created.
+        """
+        self.symbol: str = symbol
+        self.exchange: Exchange = exchange
+        self.gateway_name: str = gateway_name
+        self.tz: Optional[tzinfo] = tz
+
+        if exchange:
+            self.vt_symbol: str = generate_vt_symbol(symbol, exchange)
+        else:
+            self.vt_symbol: str = symbol
+
+        if data is None:
+            data = np.zeros(0, dtype=self.get_dtype())
+        self.data: np.ndarray = data
+
+    @classmethod
+    def get_dtype(cls) -> np.dtype:
+        """
+        Get dtype of structured array.
+        """
+        columns: list = [(name, DATETIME_DTYPE) for name in cls.datetime_fields]
+        columns.extend((name, np.float64) for name in cls.float_fields)
+        return np.dtype(columns)
+
+    @classmethod
+    def from_list(cls, objects: Sequence[Union[BarData, TickData]], **kwargs) -> "BaseBatch":
+        """
+        Create batch from list of data objects, which should be sorted
+        by datetime and share the same symbol and exchange.
+        """
+        if not objects:
+            return cls("", None, **kwargs)
+
+        first: Union[BarData, TickData] = objects[0]
+        dtype: np.dtype = cls.get_dtype()
+
+        data: np.ndarray = np.empty(len(objects), dtype=dtype)
+
+        for name in cls.datetime_fields:
+            values: list = [
+                dt.replace(tzinfo=None) if dt else None
+                for dt in (getattr(obj, name) for obj in objects)
+            ]
+            data[name] = np.array(values, dtype=DATETIME_DTYPE)
+
+        for name in cls.float_fields:
+            data[name] = [getattr(obj, name) for obj in objects]
+
+        params: Dict[str, Any] = {
+            name: getattr(first, name)
+            for name in cls.meta_fields if name != "vt_symbol"
+        }
+        params.update(kwargs)
+
+        return cls(data=data, tz=first.datetime.tzinfo, **params)
+
+    def to_list(self) -> List[Union[BarData, TickData]]:
+        """
+        Convert batch into list of data objects.
+        """
+        columns: list = []
+
+        for name in self.datetime_fields:
+            columns.append([self.to_datetime(value) for value in self.data[name].astype(object)])
+
+        for name in self.float_fields:
+            columns.append(self.data[name].tolist())
+
+        meta: Dict[str, Any] = self.get_meta()
+        names: tuple = self.datetime_fields + self.float_fields
+        data_class: type = self.data_class
+
+        return [data_class(**meta, **dict(zip(names, values))) for values in zip(*columns)]
+
+    def create_data(self, values: tuple) -> Union[BarData, TickData]:
+        """
+        Create data object with values of a row in column order.
+        """
+        params: Dict[str, Any] = self.get_meta()
+        params.update(zip(self.datetime_fields + self.float_fields, values))
+
+        for name in self.datetime_fields:
+            params[name] = self.to_datetime(params[name])
+
+        return self.data_class(**params)
+
+    def get_meta(self) -> Dict[str, Any]:
+        """
+        Get common values of data objects in batch.
+        """
+        return {name: getattr(self, name) for name in self.meta_fields if name != "vt_symbol"}
+
+    def to_datetime(self, value: Union[np.datetime64, datetime, None]) -> Optional[datetime]:
+        """
+        Convert value in datetime column into datetime with timezone.
+        """
+        if isinstance(value, np.datetime64):
+            value = value.astype(object)
+
+        if value is None:
+            return None
+        return value.replace(tzinfo=self.tz)
+
+    def to_datetime64(self, dt: datetime) -> np.datetime64:
+        """
+        Convert datetime into wall-clock time of batch timezone.
+        """
+        if dt.tzinfo and self.tz:
+            dt = dt.astimezone(self.tz)
+        return np.datetime64(dt.replace(tzinfo=None), "us")
+
+    def slice_time(self, start: datetime = None, end: datetime = None) -> "BaseBatch":
+        """
+        Get rows with datetime between start and end (both inclusive),
+        as a batch sharing the same memory.
+        """
+        column: np.ndarray = self.data["datetime"]
+
+        if start:
+            i: int = np.searchsorted(column, self.to_datetime64(start), "left")
+        else:
+            i: int = 0
+
+        if end:
+            j: int = np.searchsorted(column, self.to_datetime64(end), "right")
+        else:
+            j: int = len(column)
+
+        return self.new_batch(self.data[i:j])
+
+    def new_batch(self, data: np.ndarray) -> "BaseBatch":
+        """
+        Create batch of the same type and meta data with new array.
+        """
+        batch: BaseBatch = self.__class__.__new__(self.__class__)
+        batch.__dict__.update(self.__dict__)
+        batch.data = data
+        return batch
+
+    def __len__(self) -> int:
+        """"""
+        return len(self.data)
+
+    def __getitem__(self, key: Any) -> Union[BatchRow, np.ndarray, "BaseBatch"]:
+        """
+        Get row view by integer, column array by name, or sub batch by
+        slice, index array or boolean mask.
+        """
+        if isinstance(key, (int, np.integer)):
+            return self.row_class(self, self.data[key])
+        elif isinstance(key, str):
+            return self.data[key]
+        else:
+            return self.new_batch(self.data[key])
+
+    def __iter__(self) -> Iterator[BatchRow]:
+        """
+        Iterate row views of batch.
+        """
+        row_class: type = self.row_class
+        for record in self.data:
+            yield row_class(self, record)
+
+    def __repr__(self) -> str:
+        """"""
+        return f"{self.__class__.__name__}({self.vt_symbol}, {len(self)} rows)"
+
+
+class BarRow(BatchRow):
+    """
+    Row view of BarBatch.
+    """
+
+    __slots__ = ()
+
+
+class BarBatch(BaseBatch):
+    """
+    Columnar container of bar data.
+    """
+
+    data_class: type = BarData
+    row_class: type = BarRow
+
+    float_fields: Tuple[str, ...] = tuple(BAR_FIELDS)
+    meta_fields: Tuple[str, ...] = ("symbol", "exchange", "interval", "gateway_name", "vt_symbol")
+
+    def __init__(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval = None,
+        data: Optional[np.ndarray] = None,
+        gateway_name: str = "",
+        tz: Optional[tzinfo] = None
+    ) -> None:
+        """"""
+        super().__init__(symbol, exchange, data, gateway_name, tz)
+
+        self.interval: Interval = interval
+
+    @classmethod
+    def from_bars(cls, bars: Sequence[BarData]) -> "BarBatch":
+        """
+        Create batch from list of bar data.
+        """
+        return cls.from_list(bars)
+
+    def to_bars(self) -> List[BarData]:
+        """
+        Convert batch into list of bar data.
+        """
+        return self.to_list()
+
+
+class TickRow(BatchRow):
+    """
+    Row view of TickBatch.
+    """
+
+    __slots__ = ()
+
+
+class TickBatch(BaseBatch):
+    """
+    Columnar container of tick data.
+    """
+
+    data_class: type = TickData
+    row_class: type = TickRow
+
+    datetime_fields: Tuple[str, ...] = ("datetime", "localtime")
+    float_fields: Tuple[str, ...] = tuple(TICK_FIELDS)
+    meta_fields: Tuple[str, ...] = ("symbol", "exchange", "name", "gateway_name", "vt_symbol")
+
+    def __init__(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        data: Optional[np.ndarray] = None,
+        name: str = "",
+        gateway_name: str = "",
+        tz: Optional[tzinfo] = None
+    ) -> None:
+        """"""
+        super().__init__(symbol, exchange, data, gateway_name, tz)
+
+        self.name: str = name
+
+    @classmethod
+    def from_ticks(cls, ticks: Sequence[TickData]) -> "TickBatch":
+        """
+        Create batch from list of tick data.
+        """
+        return cls.from_list(ticks)
+
+    def to_ticks(self) -> List[TickData]:
+        """
+        Convert batch into list of tick data.
+        """
+        return self.to_list()
+
+
+class TickBuffer:
+    """
+    Fixed-capacity buffer of the latest ticks of a symbol, with each field
+    stored as a float64 column, and datetime as POSIX timestamp in column
+    named timestamp.
+
+    Each column has room for twice the capacity. Ticks are appended until
+    the end, then the latest ones are moved to the front, so that the
+    latest ticks are always contiguous and can be returned as views
+    without copying, at amortized constant cost per tick.
+
+    Views are read-only and share memory with buffer, so their values
+    change with later ticks. Copy them if they need to be kept.
+    """
+
+    def __init__(self, capacity: int, fields: Sequence[str] = TICK_BUFFER_FIELDS) -> None:
+        """"""
+        self.capacity: int = capacity
+        self.fields: List[str] = list(fields)
+        self.get_values: attrgetter = attrgetter(*self.fields)
+
+        self.indexes: Dict[str, int] = {name: i for i, name in enumerate(self.fields)}
+        self.indexes["timestamp"] = len(self.fields)
+
+        self.data: np.ndarray = np.zeros((len(self.fields) + 1, capacity * 2))
+        self.end: int = 0
+        self.count: int = 0
+
+    def update_tick(self, tick: TickData) -> None:
+        """
+        Append tick into buffer.
+        """
+        data: np.ndarray = self.data
+        end: int = self.end
+
+        if end == data.shape[1]:
+            data[:, :self.capacity] = data[:, self.capacity:]
+            end = self.capacity
+
+        data[:-1, end] = self.get_values(tick)
+        data[-1, end] = tick.datetime.timestamp()
+
+        self.end = end + 1
+        if self.count < self.capacity:
+            self.count += 1
+
+    def get_array(self, name: str, count: int = 0) -> np.ndarray:
+        """
+        Get view of column with values of the latest count ticks, or of
+        all ticks in buffer if count is 0, in time order.
+        """
+        if not count or count > self.count:
+            count = self.count
+
+        view: np.ndarray = self.data[self.indexes[name], self.end - count:self.end]
+        view.flags.writeable = False
+        return view
+
+    def get_arrays(self, count: int = 0, names: Sequence[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Get views of columns, including timestamp if names not given.
+        """
+        if names is None:
+            names = self.indexes.keys()
+        return {name: self.get_array(name, count) for name in names}
+
+    def get_datetime(self, count: int = 0) -> np.ndarray:
+        """
+        Get datetime64 of the latest count ticks in UTC, which is a copy.
+        """
+        timestamps: np.ndarray = self.get_array("timestamp", count)
+        return (timestamps * 1e6).round().astype("datetime64[us]")
+
+    def __len__(self) -> int:
+        """"""
+        return self.count
+
+    def __repr__(self) -> str:
+        """"""
+        return f"{self.__class__.__name__}({self.count}/{self.capacity} ticks)"
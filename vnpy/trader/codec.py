@@ -0,0 +1,437 @@
+"""
+Binary codec of data objects and requests in the trading platform.
+"""
+
+import pickle
+from dataclasses import fields
+from datetime import datetime, timedelta, timezone, tzinfo
+from enum import Enum
+from operator import attrgetter
+from struct import Struct, error as StructError
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from .object import (
+    TickData,
+    BarData,
+    OrderData,
+    TradeData,
+    PositionData,
+    AccountData,
+    LogData,
+    ContractData,
+    QuoteData,
+    SubscribeRequest,
+    OrderRequest,
+    CancelRequest,
+    HistoryRequest,
+    QuoteRequest,
+    PortfolioData,
+    SlotTickData,
+    SlotBarData,
+    SlotOrderData,
+    SlotTradeData
+)
+from .utility import ZoneInfo
+
+
+# Version of binary layout, which should be increased whenever fields of
+# classes below are changed.
+CODEC_VERSION: int = 1
+
+# Class id is the index in list, so new class should only be appended.
+CODEC_CLASSES: List[type] = [
+    TickData,
+    BarData,
+    OrderData,
+    TradeData,
+    PositionData,
+    AccountData,
+    LogData,
+    ContractData,
+    QuoteData,
+    SubscribeRequest,
+    OrderRequest,
+    CancelRequest,
+    HistoryRequest,
+    QuoteRequest,
+    PortfolioData,
+]
+
+# Slotted variants are encoded the same as original classes
+CODEC_ALIASES: Dict[type, type] = {
+    SlotTickData: TickData,
+    SlotBarData: BarData,
+    SlotOrderData: OrderData,
+    SlotTradeData: TradeData,
+}
+
+# Attributes set in __post_init__ which cannot be derived from fields
+CODEC_ATTRIBUTES: Dict[type, List[Tuple[str, type]]] = {
+    LogData: [("time", datetime)],
+}
+
+# Header: codec version, class id
+HEADER: Struct = Struct("<BH")
+PICKLE_CLASS_ID: int = 0xFFFF
+
+NULL_DATETIME: int = -(1 << 63)
+EPOCH: datetime = datetime(1970, 1, 1)
+MICROSECOND: timedelta = timedelta(microseconds=1)
+
+# Struct format of each kind of field, while str, datetime tz and other
+# fields have byte length in fixed part and data in variable part.
+FORMATS: Dict[str, str] = {
+    "float": "d",
+    "int": "q",
+    "bool": "?",
+    "enum": "h",
+    "datetime": "q",
+    "str": "I",
+    "object": "I",
+}
+
+
+def get_kind(name: str, type_: Any) -> str:
+    """
+    Get kind of field by its type annotation.
+    """
+    # Annotation of field named datetime with default None is shadowed
+    # by the default value in class body, e.g. OrderData.datetime.
+    if type_ is None and name == "datetime":
+        type_ = datetime
+
+    if type_ in (float, int, bool, str, datetime):
+        return type_.__name__
+    elif isinstance(type_, type) and issubclass(type_, Enum):
+        return "enum"
+    else:
+        return "object"
+
+
+def create_getter(names: Sequence[str]) -> Callable[[Any], tuple]:
+    """
+    Create function for getting tuple of attribute values.
+    """
+    if not names:
+        return lambda obj: ()
+    elif len(names) == 1:
+        getter: attrgetter = attrgetter(names[0])
+        return lambda obj: (getter(obj),)
+    else:
+        return attrgetter(*names)
+
+
+class ClassSchema:
+    """
+    Binary layout of one class.
+
+    Fixed part is packed by struct in order of: header, bitmask of None
+    values, then values of float, int, bool, enum and datetime fields,
+    and byte lengths of str, tz of datetime, and other fields. Variable
+    part follows with bytes of them concatenated.
+
+    Enum is encoded as int16 index in definition order (values are
+    translated by locale), and datetime as int64 nanoseconds of its
+    wall-clock time with tz name (ZoneInfo key) stored separately.
+    Fields of other types (e.g. extra dict) are pickled.
+    """
+
+    def __init__(self, cls: type, class_id: int, attributes: Sequence[Tuple[str, type]] = ()) -> None:
+        """"""
+        self.cls: type = cls
+        self.class_id: int = class_id
+
+        groups: Dict[str, List[str]] = {kind: [] for kind in FORMATS}
+        enum_types: List[Type[Enum]] = []
+
+        self.post_init: Optional[Callable] = getattr(cls, "__post_init__", None)
+        self.attribute_names: List[str] = [name for name, _ in attributes]
+
+        items: List[Tuple[str, Any]] = [(f.name, f.type) for f in fields(cls)]
+        items.extend(attributes)
+
+        if len(items) > 64:
+            raise ValueError(f"Too many fields to encode in {cls.__name__}")
+
+        for name, type_ in items:
+            kind: str = get_kind(name, type_)
+            groups[kind].append(name)
+            if kind == "enum":
+                enum_types.append(type_)
+
+        self.float_names: List[str] = groups["float"]
+        self.int_names: List[str] = groups["int"]
+        self.bool_names: List[str] = groups["bool"]
+        self.enum_names: List[str] = groups["enum"]
+        self.datetime_names: List[str] = groups["datetime"]
+        self.str_names: List[str] = groups["str"]
+        self.object_names: List[str] = groups["object"]
+
+        # Values of float, int and bool fields are used directly
+        self.raw_names: List[str] = self.float_names + self.int_names + self.bool_names
+
+        # Bit of each field in None bitmask
+        self.names: List[str] = self.raw_names + self.str_names + self.object_names
+        self.bits: Dict[str, int] = {name: 1 << i for i, name in enumerate(self.names)}
+
+        self.get_raw: Callable = create_getter(self.raw_names)
+        self.get_enums: Callable = create_getter(self.enum_names)
+        self.get_datetimes: Callable = create_getter(self.datetime_names)
+        self.get_strs: Callable = create_getter(self.str_names)
+        self.get_objects: Callable = create_getter(self.object_names)
+
+        self.enum_members: List[List[Enum]] = [list(t) for t in enum_types]
+        self.enum_indexes: List[Dict[Enum, int]] = [
+            {member: i for i, member in enumerate(members)}
+            for members in self.enum_members
+        ]
+
+        self.raw_count: int = len(self.raw_names)
+        self.enum_count: int = len(self.enum_names)
+        self.datetime_count: int = len(self.datetime_names)
+        self.str_count: int = len(self.str_names)
+        self.object_count: int = len(self.object_names)
+
+        self.struct: Struct = Struct(
+            "<BHQ"
+            + FORMATS["float"] * len(self.float_names)
+            + FORMATS["int"] * len(self.int_names)
+            + FORMATS["bool"] * len(self.bool_names)
+            + FORMATS["enum"] * self.enum_count
+            + FORMATS["datetime"] * self.datetime_count
+            + FORMATS["str"] * (self.str_count + self.datetime_count)
+            + FORMATS["object"] * self.object_count
+        )
+
+
+class ObjectCodec:
+    """
+    Encoder and decoder of data objects and requests in object.py with
+    fixed binary layout, which is faster and much smaller than pickle.
+
+    Any other object is pickled with a special class id, so encode and
+    decode can be used for data of any event, e.g. as dumps/loads of
+    JournalWriter and SharedEventPublisher.
+
+    Decoded objects are always of the original classes, even if slotted
+    variants encoded.
+    """
+
+    def __init__(self) -> None:
+        """"""
+        self.schemas: Dict[type, ClassSchema] = {}
+        self.schema_list: List[ClassSchema] = []
+
+        for class_id, cls in enumerate(CODEC_CLASSES):
+            schema: ClassSchema = ClassSchema(cls, class_id, CODEC_ATTRIBUTES.get(cls, ()))
+            self.schemas[cls] = schema
+            self.schema_list.append(schema)
+
+        for alias, cls in CODEC_ALIASES.items():
+            self.schemas[alias] = self.schemas[cls]
+
+        self.tz_names: Dict[Optional[tzinfo], bytes] = {None: b""}
+        self.tz_infos: Dict[bytes, Optional[tzinfo]] = {b"": None}
+
+        self.pickle_header: bytes = HEADER.pack(CODEC_VERSION, PICKLE_CLASS_ID)
+
+    def encode(self, obj: Any) -> bytes:
+        """
+        Encode object into bytes.
+        """
+        schema: Optional[ClassSchema] = self.schemas.get(type(obj), None)
+
+        if schema:
+            # Values not matching annotations (e.g. float in int field)
+            # cannot be packed, and are pickled instead.
+            try:
+                return self.encode_schema(obj, schema)
+            except (TypeError, AttributeError, KeyError, StructError):
+                pass
+
+        return self.pickle_header + pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+    def encode_schema(self, obj: Any, schema: ClassSchema) -> bytes:
+        """
+        Encode object with binary layout of its class.
+        """
+        nulls: int = 0
+        bits: Dict[str, int] = schema.bits
+
+        raw: tuple = schema.get_raw(obj)
+        if None in raw:
+            raw, nulls = self.mask_nulls(raw, schema.raw_names, bits, nulls)
+
+        enums: list = [
+            -1 if member is None else indexes[member]
+            for member, indexes in zip(schema.get_enums(obj), schema.enum_indexes)
+        ]
+
+        timestamps: list = []
+        tz_names: list = []
+        for dt in schema.get_datetimes(obj):
+            if dt is None:
+                timestamps.append(NULL_DATETIME)
+                tz_names.append(b"")
+            else:
+                timestamps.append((dt.replace(tzinfo=None) - EPOCH) // MICROSECOND * 1000)
+                tz_names.append(self.get_tz_name(dt.tzinfo))
+
+        payloads: list = []
+        for name, value in zip(schema.str_names, schema.get_strs(obj)):
+            if value is None:
+                nulls |= bits[name]
+                payloads.append(b"")
+            else:
+                payloads.append(value.encode("utf-8"))
+
+        payloads.extend(tz_names)
+
+        for name, value in zip(schema.object_names, schema.get_objects(obj)):
+            if value is None:
+                nulls |= bits[name]
+                payloads.append(b"")
+            else:
+                payloads.append(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+        fixed: bytes = schema.struct.pack(
+            CODEC_VERSION,
+            schema.class_id,
+            nulls,
+            *raw,
+            *enums,
+            *timestamps,
+            *map(len, payloads)
+        )
+        return b"".join([fixed, *payloads])
+
+    def decode(self, data: bytes) -> Any:
+        """
+        Decode object from bytes.
+        """
+        version, class_id = HEADER.unpack_from(data)
+        if version != CODEC_VERSION:
+            raise ValueError(f"Unsupported codec version: {version}")
+
+        if class_id == PICKLE_CLASS_ID:
+            return pickle.loads(data[HEADER.size:])
+
+        schema: ClassSchema = self.schema_list[class_id]
+        values: tuple = schema.struct.unpack_from(data)
+
+        nulls: int = values[2]
+        i: int = 3
+
+        kwargs: Dict[str, Any] = dict(zip(schema.raw_names, values[i:i + schema.raw_count]))
+        i += schema.raw_count
+
+        for name, index, members in zip(schema.enum_names, values[i:i + schema.enum_count], schema.enum_members):
+            kwargs[name] = None if index < 0 else members[index]
+        i += schema.enum_count
+
+        timestamps: tuple = values[i:i + schema.datetime_count]
+        i += schema.datetime_count
+
+        # Split variable part by lengths
+        position: int = schema.struct.size
+        payloads: list = []
+        for length in values[i:]:
+            payloads.append(data[position:position + length])
+            position += length
+
+        for name, payload in zip(schema.str_names, payloads):
+            kwargs[name] = payload.decode("utf-8")
+
+        tz_payloads: list = payloads[schema.str_count:schema.str_count + schema.datetime_count]
+        for name, timestamp, tz_name in zip(schema.datetime_names, timestamps, tz_payloads):
+            if timestamp == NULL_DATETIME:
+                kwargs[name] = None
+            else:
+                dt: datetime = EPOCH + timedelta(microseconds=timestamp // 1000)
+                kwargs[name] = dt.replace(tzinfo=self.get_tz_info(tz_name))
+
+        for name, payload in zip(schema.object_names, payloads[schema.str_count + schema.datetime_count:]):
+            kwargs[name] = pickle.loads(payload) if payload else None
+
+        if nulls:
+            for name in schema.names:
+                if nulls & schema.bits[name]:
+                    kwargs[name] = None
+
+        # Create object without __init__ like pickle, and then derive
+        # attributes like vt_symbol by __post_init__.
+        obj: Any = schema.cls.__new__(schema.cls)
+        obj.__dict__ = kwargs
+
+        if schema.post_init:
+            attributes: list = [kwargs[name] for name in schema.attribute_names]
+            schema.post_init(obj)
+            kwargs.update(zip(schema.attribute_names, attributes))
+
+        return obj
+
+    def mask_nulls(self, values: tuple, names: List[str], bits: Dict[str, int], nulls: int) -> Tuple[list, int]:
+        """
+        Replace None values with zero and set their bits.
+        """
+        masked: list = []
+        for name, value in zip(names, values):
+            if value is None:
+                nulls |= bits[name]
+                masked.append(0)
+            else:
+                masked.append(value)
+        return masked, nulls
+
+    def get_tz_name(self, tz: Optional[tzinfo]) -> bytes:
+        """
+        Get encoded name of timezone: key of ZoneInfo, or fixed offset in
+        seconds prefixed with @ for other tzinfo.
+        """
+        name: Optional[bytes] = self.tz_names.get(tz, None)
+        if name is not None:
+            return name
+
+        key: Optional[str] = getattr(tz, "key", None)
+        if key:
+            name = key.encode("utf-8")
+        else:
+            offset: timedelta = tz.utcoffset(None)
+            name = f"@{int(offset.total_seconds())}".encode("utf-8")
+
+        self.tz_names[tz] = name
+        return name
+
+    def get_tz_info(self, name: bytes) -> Optional[tzinfo]:
+        """
+        Get timezone from encoded name.
+        """
+        tz: Optional[tzinfo] = self.tz_infos.get(name, None)
+        if tz is not None or not name:
+            return tz
+
+        text: str = name.decode("utf-8")
+        if text.startswith("@"):
+            tz = timezone(timedelta(seconds=int(text[1:])))
+        else:
+            tz = ZoneInfo(text)
+
+        self.tz_infos[name] = tz
+        return tz
+
+
+codec: ObjectCodec = ObjectCodec()
+
+
+def encode(obj: Any) -> bytes:
+    """
+    Encode object into bytes with default codec.
+    """
+    return codec.encode(obj)
+
+
+def decode(data: bytes) -> Any:
+    """
+    Decode object from bytes with default codec.
+    """
+    return codec.decode(data)
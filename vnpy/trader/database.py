@@ -7,6 +7,7 @@ from importlib import import_module
 
 from .constant import Interval, Exchange
 from .object import BarData, TickData
+from .batch import BarBatch, TickBatch
 from .setting import SETTINGS
 from .utility import ZoneInfo
 from .locale import _
@@ -96,6 +97,36 @@ class BaseDatabase(ABC):
         """
         pass
 
+    def load_bar_batch(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> BarBatch:
+        """
+        Load bar data from database as columnar batch.
+
+        Database can override this to fill batch directly without
+        creating bar objects.
+        """
+        bars: List[BarData] = self.load_bar_data(symbol, exchange, interval, start, end)
+        return BarBatch.from_bars(bars)
+
+    def load_tick_batch(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> TickBatch:
+        """
+        Load tick data from database as columnar batch.
+        """
+        ticks: List[TickData] = self.load_tick_data(symbol, exchange, start, end)
+        return TickBatch.from_ticks(ticks)
+
     @abstractmethod
     def delete_bar_data(
         self,
@@ -1,17 +1,21 @@
 import logging
-from logging import Logger
+from logging import Logger, INFO
 import smtplib
 import os
 from abc import ABC
+from collections import OrderedDict, deque
+from copy import copy
 from pathlib import Path
 from datetime import datetime
 from email.message import EmailMessage
 from queue import Empty, Queue
-from threading import Thread
-from typing import Any, Type, Dict, List, Optional
+from threading import Lock, Thread
+from typing import Any, Deque, Type, Dict, Iterator, List, Mapping, Optional, Set
 
-from vnpy.event import Event, EventEngine
+from vnpy.event import Event, EventEngine, EventProfiler
 from .app import BaseApp
+from .archive import DataArchive
+from .batch import TickBuffer
 from .event import (
     EVENT_TICK,
     EVENT_ORDER,
@@ -20,8 +24,12 @@ from .event import (
     EVENT_ACCOUNT,
     EVENT_CONTRACT,
     EVENT_LOG,
-    EVENT_QUOTE
+    EVENT_QUOTE,
+    EVENT_TIMER,
+    EVENT_PORTFOLIO,
+    EVENT_RECONCILE
 )
+from .constant import Direction, Offset
 from .gateway import BaseGateway
 from .object import (
     CancelRequest,
@@ -38,11 +46,13 @@ from .object import (
     PositionData,
     AccountData,
     ContractData,
+    PortfolioData,
     Exchange
 )
 from .setting import SETTINGS
-from .utility import get_folder_path, TRADER_DIR
-from .converter import OffsetConverter
+from .snapshot import SNAPSHOT_FILENAME, HOLDING_FIELDS, SnapshotWriter, read_snapshot
+from .utility import get_file_path, get_folder_path, TRADER_DIR
+from .converter import OffsetConverter, PositionHolding
 from .locale import _
 
 
@@ -111,14 +121,38 @@ class MainEngine:
         self.add_engine(OmsEngine)
         self.add_engine(EmailEngine)
 
-    def write_log(self, msg: str, source: str = "") -> None:
+    def write_log(self, msg: str, source: str = "", level: int = INFO) -> None:
         """
         Put log event with specific message.
         """
-        log: LogData = LogData(msg=msg, gateway_name=source)
+        log: LogData = LogData(msg=msg, gateway_name=source, level=level)
         event: Event = Event(EVENT_LOG, log)
         self.event_engine.put(event)
 
+    def enable_event_profiling(self, report_interval: int = 60) -> EventProfiler:
+        """
+        Enable profiling of event engine, and write profiler summary
+        into log every report_interval seconds.
+        """
+        return self.event_engine.enable_profiling(report_interval, self.write_log)
+
+    def enable_event_watchdog(self, handler_timeout: float = 1, queue_timeout: float = 1) -> None:
+        """
+        Enable watchdog of event engine, and write warning into log when
+        any handler or queued event exceeds timeout (seconds).
+
+        Warnings are written into logger directly from the watchdog
+        thread, since log event would be stuck in queue behind the
+        blocking handler.
+        """
+        self.event_engine.enable_watchdog(handler_timeout, queue_timeout, self.write_warning)
+
+    def write_warning(self, msg: str) -> None:
+        """
+        Write warning into logger without going through event engine.
+        """
+        logging.getLogger("veighna").warning(msg)
+
     def get_gateway(self, gateway_name: str) -> BaseGateway:
         """
         Return gateway object by name.
@@ -337,6 +371,168 @@ class LogEngine(BaseEngine):
         self.logger.log(log.level, log.msg)
 
 
+# Names of dicts in OMS state by kind of data updated together
+STATE_FIELDS: Dict[str, List[str]] = {
+    "tick": ["ticks"],
+    "order": ["orders", "active_orders"],
+    "trade": ["trades"],
+    "position": ["positions"],
+    "account": ["accounts"],
+    "contract": ["contracts"],
+    "quote": ["quotes", "active_quotes"],
+}
+
+# Max layers of changes in state mapping before flattened into one dict
+STATE_DEPTH: int = 16
+
+# Marker of key removed or not found in layer of state mapping
+REMOVED: object = object()
+
+
+class StateMapping(Mapping):
+    """
+    Read-only mapping in OMS state, made of a layer of changed keys over
+    the mapping of last state, so that a new state only costs the keys
+    changed since then.
+
+    Mapping is flattened into a plain dict the first time it's iterated,
+    or when there're too many layers, so lookups never walk far.
+    """
+
+    def __init__(self, data: dict, parent: Optional["StateMapping"] = None) -> None:
+        """
+        Without parent, data is the flat dict which is never changed.
+        Otherwise data contains values of changed keys, or REMOVED.
+        """
+        self.changes: dict = data
+        self.parent: Optional[StateMapping] = parent
+
+        if parent is None:
+            self.flat: Optional[dict] = data
+            self.depth: int = 0
+            self.size: int = len(data)
+            return
+
+        self.flat: Optional[dict] = None
+        self.depth: int = parent.depth + 1
+
+        size: int = len(parent)
+        for key, value in data.items():
+            found: bool = key in parent
+            if value is REMOVED:
+                size -= found
+            elif not found:
+                size += 1
+        self.size: int = size
+
+    def __getitem__(self, key: Any) -> Any:
+        """"""
+        mapping: StateMapping = self
+
+        while True:
+            flat: Optional[dict] = mapping.flat
+            if flat is not None:
+                return flat[key]
+
+            value: Any = mapping.changes.get(key, REMOVED)
+            if value is not REMOVED:
+                return value
+            elif key in mapping.changes:
+                raise KeyError(key)
+
+            # Parent is only released after flattened
+            parent: Optional[StateMapping] = mapping.parent
+            if parent is None:
+                return mapping.flat[key]
+            mapping = parent
+
+    def __iter__(self) -> Iterator:
+        """"""
+        return iter(self.get_flat())
+
+    def __len__(self) -> int:
+        """"""
+        return self.size
+
+    def keys(self) -> Any:
+        """"""
+        return self.get_flat().keys()
+
+    def values(self) -> Any:
+        """"""
+        return self.get_flat().values()
+
+    def items(self) -> Any:
+        """"""
+        return self.get_flat().items()
+
+    def get_flat(self) -> dict:
+        """
+        Get the plain dict of all data, which is created once and cached.
+        """
+        flat: Optional[dict] = self.flat
+        if flat is not None:
+            return flat
+
+        # Collect layers down to the nearest flat one, which is copied once
+        layers: List[StateMapping] = []
+        mapping: StateMapping = self
+
+        while mapping.flat is None:
+            layers.append(mapping)
+
+            # Parent is only released after flattened
+            parent: Optional[StateMapping] = mapping.parent
+            if parent is None:
+                break
+            mapping = parent
+
+        flat = dict(mapping.flat)
+        for layer in reversed(layers):
+            for key, value in layer.changes.items():
+                if value is REMOVED:
+                    flat.pop(key, None)
+                else:
+                    flat[key] = value
+
+        self.flat = flat
+        self.parent = None
+        self.depth = 0
+        return flat
+
+    def update(self, source: dict, keys: Set[str]) -> "StateMapping":
+        """
+        Create mapping of next state with keys changed in source dict.
+        """
+        mapping: StateMapping = StateMapping({key: source.get(key, REMOVED) for key in keys}, self)
+
+        if mapping.depth > STATE_DEPTH:
+            mapping = StateMapping(mapping.get_flat())
+        return mapping
+
+
+class OmsState:
+    """
+    Read-only view of OMS state at a version, which never changes after
+    created, so it can be shared and iterated by any thread.
+    """
+
+    def __init__(self, version: int, kind_versions: Dict[str, int], data: Dict[str, Mapping]) -> None:
+        """"""
+        self.version: int = version
+        self.kind_versions: Dict[str, int] = kind_versions
+
+        self.ticks: Mapping[str, TickData] = data["ticks"]
+        self.orders: Mapping[str, OrderData] = data["orders"]
+        self.trades: Mapping[str, TradeData] = data["trades"]
+        self.positions: Mapping[str, PositionData] = data["positions"]
+        self.accounts: Mapping[str, AccountData] = data["accounts"]
+        self.contracts: Mapping[str, ContractData] = data["contracts"]
+        self.quotes: Mapping[str, QuoteData] = data["quotes"]
+        self.active_orders: Mapping[str, OrderData] = data["active_orders"]
+        self.active_quotes: Mapping[str, QuoteData] = data["active_quotes"]
+
+
 class OmsEngine(BaseEngine):
     """
     Provides order management system function.
@@ -357,11 +553,61 @@ class OmsEngine(BaseEngine):
         self.active_orders: Dict[str, OrderData] = {}
         self.active_quotes: Dict[str, QuoteData] = {}
 
+        # Secondary indexes of active orders and quotes, updated together
+        # with active dicts above so that lookups only visit the results
+        self.symbol_active_orders: Dict[str, Dict[str, OrderData]] = {}
+        self.gateway_active_orders: Dict[str, Dict[str, OrderData]] = {}
+        self.direction_active_orders: Dict[Direction, Dict[str, OrderData]] = {}
+        self.symbol_active_quotes: Dict[str, Dict[str, QuoteData]] = {}
+        self.gateway_active_quotes: Dict[str, Dict[str, QuoteData]] = {}
+
         self.offset_converters: Dict[str, OffsetConverter] = {}
 
+        # Latest ticks of each symbol are kept in buffer, if capacity set
+        self.tick_buffer_size: int = SETTINGS["oms.tick_buffer"]
+        self.tick_buffers: Dict[str, TickBuffer] = {}
+
+        # Version is increased before and after each update, and version
+        # of kind is set when update begins. Keys changed since last state
+        # are recorded by kind, so that new state only copies them. Updates
+        # are serialized by lock, as ShardedEventEngine calls handlers from
+        # several worker threads, and new state is built with lock held.
+        self.state_lock: Lock = Lock()
+        self.version: int = 0
+        self.state_versions: Dict[str, int] = {kind: 0 for kind in STATE_FIELDS}
+        self.changed_keys: Dict[str, Set[str]] = {kind: set() for kind in STATE_FIELDS}
+        self.state: Optional[OmsState] = None
+
+        # Finished orders and trades beyond recent window are moved from
+        # memory into archive on disk, if enabled
+        self.archive: Optional[DataArchive] = None
+        self.archive_path: Path = get_file_path(f"oms_archive_{os.getpid()}.db")
+        self.order_window: int = SETTINGS["oms.order_window"]
+        self.trade_window: int = SETTINGS["oms.trade_window"]
+        self.finished_orderids: Dict[str, None] = OrderedDict()
+        self.trade_ids: Deque[str] = deque()
+
+        if SETTINGS["oms.archive"]:
+            self.archive = DataArchive(str(self.archive_path))
+
+        # State is saved into snapshot periodically and when closed, and
+        # restored when started. Restored data not yet confirmed by fresh
+        # data from gateway is kept by kind until reconciled.
+        self.snapshot_writer: Optional[SnapshotWriter] = None
+        self.snapshot_path: Path = get_file_path(SNAPSHOT_FILENAME)
+        self.snapshot_interval: int = SETTINGS["oms.snapshot_interval"]
+        self.snapshot_count: int = 0
+        self.unconfirmed: Dict[str, Set[str]] = {}
+
+        if SETTINGS["oms.snapshot"]:
+            self.snapshot_writer = SnapshotWriter(self.snapshot_path)
+
         self.add_function()
         self.register_event()
 
+        if self.snapshot_writer:
+            self.load_snapshot()
+
     def add_function(self) -> None:
         """Add query function to main engine."""
         self.main_engine.get_tick = self.get_tick
@@ -385,6 +631,11 @@ class OmsEngine(BaseEngine):
         self.main_engine.update_order_request = self.update_order_request
         self.main_engine.convert_order_request = self.convert_order_request
         self.main_engine.get_converter = self.get_converter
+        self.main_engine.get_oms_state = self.get_state
+        self.main_engine.get_tick_buffer = self.get_tick_buffer
+
+        self.main_engine.save_snapshot = self.save_snapshot
+        self.main_engine.reconcile_snapshot = self.reconcile_snapshot
 
     def register_event(self) -> None:
         """"""
@@ -395,23 +646,64 @@ class OmsEngine(BaseEngine):
         self.event_engine.register(EVENT_ACCOUNT, self.process_account_event)
         self.event_engine.register(EVENT_CONTRACT, self.process_contract_event)
         self.event_engine.register(EVENT_QUOTE, self.process_quote_event)
+        self.event_engine.register(EVENT_RECONCILE, self.process_reconcile_event)
+
+        if self.snapshot_writer and self.snapshot_interval:
+            self.event_engine.register(EVENT_TIMER, self.process_timer_event)
+
+    def process_timer_event(self, event: Event) -> None:
+        """"""
+        self.snapshot_count += 1
+        if self.snapshot_count < self.snapshot_interval:
+            return
+        self.snapshot_count = 0
+
+        self.save_snapshot()
 
     def process_tick_event(self, event: Event) -> None:
         """"""
         tick: TickData = event.data
-        self.ticks[tick.vt_symbol] = tick
+
+        with self.state_lock:
+            self.version += 1
+            self.state_versions["tick"] = self.version
+            self.ticks[tick.vt_symbol] = tick
+            if self.state:
+                self.changed_keys["tick"].add(tick.vt_symbol)
+            self.version += 1
+
+        if self.tick_buffer_size:
+            buffer: Optional[TickBuffer] = self.tick_buffers.get(tick.vt_symbol, None)
+            if not buffer:
+                buffer = TickBuffer(self.tick_buffer_size)
+                self.tick_buffers[tick.vt_symbol] = buffer
+            buffer.update_tick(tick)
 
     def process_order_event(self, event: Event) -> None:
         """"""
         order: OrderData = event.data
-        self.orders[order.vt_orderid] = order
 
-        # If order is active, then update data in dict.
-        if order.is_active():
-            self.active_orders[order.vt_orderid] = order
-        # Otherwise, pop inactive order from in dict
-        elif order.vt_orderid in self.active_orders:
-            self.active_orders.pop(order.vt_orderid)
+        with self.state_lock:
+            self.version += 1
+            self.state_versions["order"] = self.version
+            self.orders[order.vt_orderid] = order
+            if self.state:
+                self.changed_keys["order"].add(order.vt_orderid)
+
+            if self.unconfirmed:
+                self.confirm_data("order", order.vt_orderid)
+
+            if self.archive:
+                self.update_finished_order(order)
+
+            # If order is active, then update data in dict.
+            if order.is_active():
+                self.add_active_order(order)
+            # Otherwise, pop inactive order from in dict
+            elif order.vt_orderid in self.active_orders:
+                self.remove_active_order(self.active_orders.pop(order.vt_orderid))
+
+            self.version += 1
 
         # Update to offset converter
         converter: OffsetConverter = self.offset_converters.get(order.gateway_name, None)
@@ -421,7 +713,16 @@ class OmsEngine(BaseEngine):
     def process_trade_event(self, event: Event) -> None:
         """"""
         trade: TradeData = event.data
-        self.trades[trade.vt_tradeid] = trade
+
+        with self.state_lock:
+            self.version += 1
+            self.state_versions["trade"] = self.version
+            if self.archive and trade.vt_tradeid not in self.trades:
+                self.update_new_trade(trade.vt_tradeid)
+            self.trades[trade.vt_tradeid] = trade
+            if self.state:
+                self.changed_keys["trade"].add(trade.vt_tradeid)
+            self.version += 1
 
         # Update to offset converter
         converter: OffsetConverter = self.offset_converters.get(trade.gateway_name, None)
@@ -431,7 +732,17 @@ class OmsEngine(BaseEngine):
     def process_position_event(self, event: Event) -> None:
         """"""
         position: PositionData = event.data
-        self.positions[position.vt_positionid] = position
+
+        with self.state_lock:
+            self.version += 1
+            self.state_versions["position"] = self.version
+            self.positions[position.vt_positionid] = position
+            if self.state:
+                self.changed_keys["position"].add(position.vt_positionid)
+            self.version += 1
+
+        if self.unconfirmed:
+            self.confirm_data("position", position.vt_positionid)
 
         # Update to offset converter
         converter: OffsetConverter = self.offset_converters.get(position.gateway_name, None)
@@ -441,12 +752,32 @@ class OmsEngine(BaseEngine):
     def process_account_event(self, event: Event) -> None:
         """"""
         account: AccountData = event.data
-        self.accounts[account.vt_accountid] = account
+
+        with self.state_lock:
+            self.version += 1
+            self.state_versions["account"] = self.version
+            self.accounts[account.vt_accountid] = account
+            if self.state:
+                self.changed_keys["account"].add(account.vt_accountid)
+            self.version += 1
+
+        if self.unconfirmed:
+            self.confirm_data("account", account.vt_accountid)
 
     def process_contract_event(self, event: Event) -> None:
         """"""
         contract: ContractData = event.data
-        self.contracts[contract.vt_symbol] = contract
+
+        with self.state_lock:
+            self.version += 1
+            self.state_versions["contract"] = self.version
+            self.contracts[contract.vt_symbol] = contract
+            if self.state:
+                self.changed_keys["contract"].add(contract.vt_symbol)
+            self.version += 1
+
+        if self.unconfirmed:
+            self.confirm_data("contract", contract.vt_symbol)
 
         # Initialize offset converter for each gateway
         if contract.gateway_name not in self.offset_converters:
@@ -455,14 +786,114 @@ class OmsEngine(BaseEngine):
     def process_quote_event(self, event: Event) -> None:
         """"""
         quote: QuoteData = event.data
-        self.quotes[quote.vt_quoteid] = quote
 
-        # If quote is active, then update data in dict.
-        if quote.is_active():
-            self.active_quotes[quote.vt_quoteid] = quote
-        # Otherwise, pop inactive quote from in dict
-        elif quote.vt_quoteid in self.active_quotes:
-            self.active_quotes.pop(quote.vt_quoteid)
+        with self.state_lock:
+            self.version += 1
+            self.state_versions["quote"] = self.version
+            self.quotes[quote.vt_quoteid] = quote
+            if self.state:
+                self.changed_keys["quote"].add(quote.vt_quoteid)
+
+            # If quote is active, then update data in dict.
+            if quote.is_active():
+                self.add_active_quote(quote)
+            # Otherwise, pop inactive quote from in dict
+            elif quote.vt_quoteid in self.active_quotes:
+                self.remove_active_quote(self.active_quotes.pop(quote.vt_quoteid))
+
+            self.version += 1
+
+    def update_finished_order(self, order: OrderData) -> None:
+        """
+        Track order finished in window, and move the oldest finished order
+        into archive if exceeding window.
+        """
+        vt_orderid: str = order.vt_orderid
+        finished_orderids: Dict[str, None] = self.finished_orderids
+
+        # Order updated back to active should never be archived
+        if order.is_active():
+            finished_orderids.pop(vt_orderid, None)
+            return
+
+        finished_orderids[vt_orderid] = None
+        finished_orderids.move_to_end(vt_orderid)
+
+        if len(finished_orderids) > self.order_window:
+            old_orderid: str = finished_orderids.popitem(last=False)[0]
+            # Saved before popped, so that it can always be found by get_order
+            self.archive.save_order(self.orders[old_orderid])
+            self.orders.pop(old_orderid)
+            if self.state:
+                self.changed_keys["order"].add(old_orderid)
+
+    def update_new_trade(self, vt_tradeid: str) -> None:
+        """
+        Move the oldest trade into archive if exceeding window.
+        """
+        self.trade_ids.append(vt_tradeid)
+
+        if len(self.trade_ids) > self.trade_window:
+            old_tradeid: str = self.trade_ids.popleft()
+            self.archive.save_trade(self.trades[old_tradeid])
+            self.trades.pop(old_tradeid)
+            if self.state:
+                self.changed_keys["trade"].add(old_tradeid)
+
+    def add_active_order(self, order: OrderData) -> None:
+        """
+        Add or update active order in dict and indexes.
+        """
+        vt_orderid: str = order.vt_orderid
+
+        # Remove old index entries if index keys changed
+        old_order: Optional[OrderData] = self.active_orders.get(vt_orderid, None)
+        if old_order and (
+            old_order.vt_symbol != order.vt_symbol
+            or old_order.gateway_name != order.gateway_name
+            or old_order.direction != order.direction
+        ):
+            self.remove_active_order(old_order)
+
+        # Updating existing entry keeps its position in each dict
+        self.active_orders[vt_orderid] = order
+        add_index(self.symbol_active_orders, order.vt_symbol, vt_orderid, order)
+        add_index(self.gateway_active_orders, order.gateway_name, vt_orderid, order)
+        add_index(self.direction_active_orders, order.direction, vt_orderid, order)
+
+    def remove_active_order(self, order: OrderData) -> None:
+        """
+        Remove order from indexes of active orders.
+        """
+        vt_orderid: str = order.vt_orderid
+        remove_index(self.symbol_active_orders, order.vt_symbol, vt_orderid)
+        remove_index(self.gateway_active_orders, order.gateway_name, vt_orderid)
+        remove_index(self.direction_active_orders, order.direction, vt_orderid)
+
+    def add_active_quote(self, quote: QuoteData) -> None:
+        """
+        Add or update active quote in dict and indexes.
+        """
+        vt_quoteid: str = quote.vt_quoteid
+
+        old_quote: Optional[QuoteData] = self.active_quotes.get(vt_quoteid, None)
+        if old_quote and (
+            old_quote.vt_symbol != quote.vt_symbol
+            or old_quote.gateway_name != quote.gateway_name
+        ):
+            self.remove_active_quote(old_quote)
+
+        self.active_quotes[vt_quoteid] = quote
+        add_index(self.symbol_active_quotes, quote.vt_symbol, vt_quoteid, quote)
+        add_index(self.gateway_active_quotes, quote.gateway_name, vt_quoteid, quote)
+
+    def remove_active_quote(self, quote: QuoteData) -> None:
+        """
+        Remove quote from indexes of active quotes.
+        """
+        vt_quoteid: str = quote.vt_quoteid
+        remove_index(self.symbol_active_quotes, quote.vt_symbol, vt_quoteid)
+        remove_index(self.gateway_active_quotes, quote.gateway_name, vt_quoteid)
 
     def get_tick(self, vt_symbol: str) -> Optional[TickData]:
         """
@@ -470,17 +901,32 @@ class OmsEngine(BaseEngine):
         """
         return self.ticks.get(vt_symbol, None)
 
+    def get_tick_buffer(self, vt_symbol: str) -> Optional[TickBuffer]:
+        """
+        Get buffer of latest ticks by vt_symbol, which is shared by all
+        readers and should not be modified.
+        """
+        return self.tick_buffers.get(vt_symbol, None)
+
     def get_order(self, vt_orderid: str) -> Optional[OrderData]:
         """
-        Get latest order data by vt_orderid.
+        Get latest order data by vt_orderid, loaded from archive if
+        not in memory.
         """
-        return self.orders.get(vt_orderid, None)
+        order: Optional[OrderData] = self.orders.get(vt_orderid, None)
+        if order is None and self.archive:
+            order = self.archive.load_order(vt_orderid)
+        return order
 
     def get_trade(self, vt_tradeid: str) -> Optional[TradeData]:
         """
-        Get trade data by vt_tradeid.
+        Get trade data by vt_tradeid, loaded from archive if not in
+        memory.
         """
-        return self.trades.get(vt_tradeid, None)
+        trade: Optional[TradeData] = self.trades.get(vt_tradeid, None)
+        if trade is None and self.archive:
+            trade = self.archive.load_trade(vt_tradeid)
+        return trade
 
     def get_position(self, vt_positionid: str) -> Optional[PositionData]:
         """
@@ -514,13 +960,15 @@ class OmsEngine(BaseEngine):
 
     def get_all_orders(self) -> List[OrderData]:
         """
-        Get all order data.
+        Get all order data in memory, not including finished orders
+        moved into archive.
         """
         return list(self.orders.values())
 
     def get_all_trades(self) -> List[TradeData]:
         """
-        Get all trade data.
+        Get all trade data in memory, not including trades moved into
+        archive.
         """
         return list(self.trades.values())
 
@@ -548,36 +996,89 @@ class OmsEngine(BaseEngine):
         """
         return list(self.quotes.values())
 
-    def get_all_active_orders(self, vt_symbol: str = "") -> List[OrderData]:
+    def get_all_active_orders(
+        self,
+        vt_symbol: str = "",
+        gateway_name: str = "",
+        direction: Direction = None
+    ) -> List[OrderData]:
         """
-        Get all active orders by vt_symbol.
+        Get all active orders by vt_symbol, gateway_name and direction.
 
-        If vt_symbol is empty, return all active orders.
+        Filters not given are ignored. If no filter is given, return all
+        active orders.
         """
-        if not vt_symbol:
+        indexes: List[Dict[str, OrderData]] = []
+
+        if vt_symbol:
+            indexes.append(self.symbol_active_orders.get(vt_symbol, {}))
+        if gateway_name:
+            indexes.append(self.gateway_active_orders.get(gateway_name, {}))
+        if direction:
+            indexes.append(self.direction_active_orders.get(direction, {}))
+
+        if not indexes:
             return list(self.active_orders.values())
-        else:
-            active_orders: List[OrderData] = [
-                order
-                for order in self.active_orders.values()
-                if order.vt_symbol == vt_symbol
-            ]
-            return active_orders
 
-    def get_all_active_quotes(self, vt_symbol: str = "") -> List[QuoteData]:
+        return select_index(indexes)
+
+    def get_all_active_quotes(self, vt_symbol: str = "", gateway_name: str = "") -> List[QuoteData]:
         """
-        Get all active quotes by vt_symbol.
-        If vt_symbol is empty, return all active qutoes.
+        Get all active quotes by vt_symbol and gateway_name.
+
+        Filters not given are ignored. If no filter is given, return all
+        active quotes.
         """
-        if not vt_symbol:
+        indexes: List[Dict[str, QuoteData]] = []
+
+        if vt_symbol:
+            indexes.append(self.symbol_active_quotes.get(vt_symbol, {}))
+        if gateway_name:
+            indexes.append(self.gateway_active_quotes.get(gateway_name, {}))
+
+        if not indexes:
             return list(self.active_quotes.values())
-        else:
-            active_quotes: List[QuoteData] = [
-                quote
-                for quote in self.active_quotes.values()
-                if quote.vt_symbol == vt_symbol
-            ]
-            return active_quotes
+
+        return select_index(indexes)
+
+    def get_state(self) -> OmsState:
+        """
+        Get consistent read-only view of OMS state, which can be called
+        from any thread.
+
+        The same view is returned without lock until state changes. When
+        changed, a new view is built with update lock held, on top of the
+        last view with only keys changed since then copied.
+        """
+        state: Optional[OmsState] = self.state
+        if state and state.version == self.version:
+            return state
+
+        with self.state_lock:
+            state = self.state
+            if state and state.version == self.version:
+                return state
+
+            data: Dict[str, Mapping] = {}
+
+            for kind, names in STATE_FIELDS.items():
+                keys: Set[str] = self.changed_keys[kind]
+
+                for name in names:
+                    if not state:
+                        data[name] = StateMapping(dict(getattr(self, name)))
+                    elif keys:
+                        data[name] = getattr(state, name).update(getattr(self, name), keys)
+                    else:
+                        data[name] = getattr(state, name)
+
+                if keys:
+                    self.changed_keys[kind] = set()
+
+            state = OmsState(self.version, dict(self.state_versions), data)
+            self.state = state
+
+        return state
 
     def update_order_request(self, req: OrderRequest, vt_orderid: str, gateway_name: str) -> None:
         """
@@ -610,6 +1111,205 @@ class OmsEngine(BaseEngine):
         """
         return self.offset_converters.get(gateway_name, None)
 
+    def save_snapshot(self) -> None:
+        """
+        Save contracts, positions, accounts, active orders and holdings of
+        offset converters into snapshot file.
+        """
+        if not self.snapshot_writer:
+            return
+
+        holdings: List[tuple] = []
+        for gateway_name, converter in self.offset_converters.items():
+            for vt_symbol, holding in converter.holdings.items():
+                values: list = [getattr(holding, name) for name in HOLDING_FIELDS]
+                holdings.append((gateway_name, vt_symbol, *values))
+
+        sections: Dict[str, list] = {
+            "contracts": list(self.contracts.values()),
+            "positions": list(self.positions.values()),
+            "accounts": list(self.accounts.values()),
+            "orders": list(self.active_orders.values()),
+        }
+
+        self.snapshot_writer.write(sections, holdings)
+
+    def load_snapshot(self) -> None:
+        """
+        Restore state from snapshot file, which should be reconciled after
+        gateways finish querying.
+        """
+        try:
+            content: Optional[dict] = read_snapshot(self.snapshot_path)
+        except Exception as e:
+            self.main_engine.write_log(_("OMS快照读取失败：{}").format(e))
+            return
+
+        if not content:
+            return
+
+        # Contracts first, so that offset converters are created
+        for contract in content["contracts"]:
+            self.process_contract_event(Event(EVENT_CONTRACT, contract))
+
+        for position in content["positions"]:
+            self.process_position_event(Event(EVENT_POSITION, position))
+
+        for account in content["accounts"]:
+            self.process_account_event(Event(EVENT_ACCOUNT, account))
+
+        # Holdings before orders, so that frozen volume is calculated
+        for gateway_name, vt_symbol, *values in content["holdings"]:
+            converter: Optional[OffsetConverter] = self.offset_converters.get(gateway_name, None)
+            if not converter or not converter.is_convert_required(vt_symbol):
+                continue
+
+            holding: PositionHolding = converter.get_position_holding(vt_symbol)
+            for name, value in zip(HOLDING_FIELDS, values):
+                setattr(holding, name, value)
+
+        for order in content["orders"]:
+            self.process_order_event(Event(EVENT_ORDER, order))
+
+        self.unconfirmed = {
+            "contract": {contract.vt_symbol for contract in content["contracts"]},
+            "position": {position.vt_positionid for position in content["positions"]},
+            "account": {account.vt_accountid for account in content["accounts"]},
+            "order": {order.vt_orderid for order in content["orders"]},
+        }
+
+        self.main_engine.write_log(_("OMS快照加载成功，合约{}个，持仓{}个，资金{}个，活动委托{}个").format(
+            len(content["contracts"]),
+            len(content["positions"]),
+            len(content["accounts"]),
+            len(content["orders"])
+        ))
+
+    def confirm_data(self, kind: str, key: str) -> None:
+        """
+        Mark restored data as confirmed by fresh data from gateway.
+        """
+        keys: Optional[Set[str]] = self.unconfirmed.get(kind, None)
+        if keys:
+            keys.discard(key)
+
+    def reconcile_snapshot(self) -> None:
+        """
+        Remove restored data not confirmed by fresh data from gateway,
+        which should be called after all gateways finish the whole query
+        cycle (e.g. contracts and then positions of CTP), otherwise data
+        not yet sent again is removed, with positions treated as closed.
+
+        Reconciling is done in event processing thread after data events
+        already queued, so it can be called from any thread.
+        """
+        self.event_engine.put(Event(EVENT_RECONCILE))
+
+    def process_reconcile_event(self, event: Event) -> None:
+        """"""
+        unconfirmed: Dict[str, Set[str]] = self.unconfirmed
+        if not unconfirmed:
+            return
+        self.unconfirmed = {}
+
+        with self.state_lock:
+            self.version += 1
+            for kind in ["contract", "position", "account", "order"]:
+                self.state_versions[kind] = self.version
+                if self.state:
+                    self.changed_keys[kind].update(unconfirmed[kind])
+
+            for vt_symbol in unconfirmed["contract"]:
+                self.contracts.pop(vt_symbol, None)
+
+            # Position not pushed again by gateway is treated as closed
+            for vt_positionid in unconfirmed["position"]:
+                position: Optional[PositionData] = self.positions.pop(vt_positionid, None)
+                if not position:
+                    continue
+
+                converter: Optional[OffsetConverter] = self.offset_converters.get(position.gateway_name, None)
+                if converter:
+                    position = copy(position)
+                    position.volume = 0
+                    position.yd_volume = 0
+                    converter.update_position(position)
+
+            for vt_accountid in unconfirmed["account"]:
+                self.accounts.pop(vt_accountid, None)
+
+            # Final status of order is unknown, so only removed from active
+            for vt_orderid in unconfirmed["order"]:
+                order: Optional[OrderData] = self.active_orders.pop(vt_orderid, None)
+                if not order:
+                    continue
+
+                self.orders.pop(vt_orderid, None)
+                self.remove_active_order(order)
+
+                converter: Optional[OffsetConverter] = self.offset_converters.get(order.gateway_name, None)
+                if converter:
+                    holding: Optional[PositionHolding] = converter.holdings.get(order.vt_symbol, None)
+                    if holding and holding.active_orders.pop(vt_orderid, None):
+                        holding.calculate_frozen()
+
+            self.version += 1
+
+        self.main_engine.write_log(_("OMS快照核对完成，移除合约{}个，持仓{}个，资金{}个，活动委托{}个").format(
+            len(unconfirmed["contract"]),
+            len(unconfirmed["position"]),
+            len(unconfirmed["account"]),
+            len(unconfirmed["order"])
+        ))
+
+    def close(self) -> None:
+        """
+        Save snapshot, then close archive and remove its file, which is
+        only for this session.
+        """
+        self.save_snapshot()
+
+        if self.archive:
+            self.archive.close()
+            self.archive = None
+            self.archive_path.unlink(missing_ok=True)
+
+
+def add_index(index: Dict[Any, Dict[str, Any]], key: Any, vt_id: str, data: Any) -> None:
+    """
+    Add data into index under key.
+    """
+    index.setdefault(key, {})[vt_id] = data
+
+
+def remove_index(index: Dict[Any, Dict[str, Any]], key: Any, vt_id: str) -> None:
+    """
+    Remove data from index under key, and the key if nothing left.
+    """
+    bucket: Optional[Dict[str, Any]] = index.get(key, None)
+    if bucket is None:
+        return
+
+    bucket.pop(vt_id, None)
+    if not bucket:
+        index.pop(key)
+
+
+def select_index(indexes: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Get data existing in all indexes, scanning only the smallest one.
+    """
+    if len(indexes) == 1:
+        return list(indexes[0].values())
+
+    indexes = sorted(indexes, key=len)
+    items: list = list(indexes[0].items())
+
+    for index in indexes[1:]:
+        items = [item for item in items if item[0] in index]
+
+    return [data for _, data in items]
+
 
 class EmailEngine(BaseEngine):
     """
@@ -672,3 +1372,381 @@ class EmailEngine(BaseEngine):
 
         self.active = False
         self.thread.join()
+
+
+class PositionPnl:
+    """
+    Mark-to-market pnl and exposure of a position.
+
+    Volume is signed, positive for long and negative for short, so that
+    long, short and net positions are calculated in the same way.
+    """
+
+    def __init__(
+        self,
+        vt_positionid: str,
+        vt_symbol: str,
+        gateway_name: str,
+        size: float,
+        margin_rate: float
+    ) -> None:
+        """"""
+        self.vt_positionid: str = vt_positionid
+        self.vt_symbol: str = vt_symbol
+        self.gateway_name: str = gateway_name
+        self.size: float = size
+        self.margin_rate: float = margin_rate
+
+        self.volume: float = 0
+        self.price: float = 0
+        self.last_price: float = 0
+
+        self.unrealized_pnl: float = 0
+        self.realized_pnl: float = 0
+        self.long_value: float = 0
+        self.short_value: float = 0
+        self.margin: float = 0
+
+    def get_values(self) -> tuple:
+        """
+        Get values summed into portfolio.
+        """
+        return (
+            self.unrealized_pnl,
+            self.realized_pnl,
+            self.long_value,
+            self.short_value,
+            self.margin
+        )
+
+    def calculate(self) -> None:
+        """
+        Calculate pnl and exposure with volume, cost price and last price.
+        """
+        value: float = self.last_price * self.volume * self.size
+        self.unrealized_pnl = (self.last_price - self.price) * self.volume * self.size
+
+        if value >= 0:
+            self.long_value = value
+            self.short_value = 0
+        else:
+            self.long_value = 0
+            self.short_value = -value
+
+        self.margin = (self.long_value + self.short_value) * self.margin_rate
+
+    def update_trade(self, price: float, volume: float) -> None:
+        """
+        Update volume and cost price with trade of signed volume.
+        """
+        if not volume:
+            return
+
+        # Trade in the same direction increases position
+        if not self.volume or (self.volume > 0) == (volume > 0):
+            new_volume: float = self.volume + volume
+            self.price = (self.price * self.volume + price * volume) / new_volume
+            self.volume = new_volume
+            return
+
+        # Otherwise position is closed, and reversed if more than held
+        close_volume: float = min(abs(volume), abs(self.volume))
+        if self.volume > 0:
+            self.realized_pnl += (price - self.price) * close_volume * self.size
+        else:
+            self.realized_pnl += (self.price - price) * close_volume * self.size
+
+        self.volume += volume
+        if abs(volume) > close_volume:
+            self.price = price
+        elif not self.volume:
+            self.price = 0
+
+
+class PortfolioPnl:
+    """
+    Sum of pnl and exposure of positions, updated with the change of each
+    position.
+    """
+
+    def __init__(self, gateway_name: str) -> None:
+        """"""
+        self.gateway_name: str = gateway_name
+
+        self.unrealized_pnl: float = 0
+        self.realized_pnl: float = 0
+        self.long_value: float = 0
+        self.short_value: float = 0
+        self.margin: float = 0
+        self.balance: float = 0
+
+    def update_values(self, old_values: tuple, new_values: tuple) -> None:
+        """
+        Update sum with old and new values of a position.
+        """
+        self.unrealized_pnl += new_values[0] - old_values[0]
+        self.realized_pnl += new_values[1] - old_values[1]
+        self.long_value += new_values[2] - old_values[2]
+        self.short_value += new_values[3] - old_values[3]
+        self.margin += new_values[4] - old_values[4]
+
+    def to_data(self, dt: Optional[datetime]) -> PortfolioData:
+        """"""
+        return PortfolioData(
+            gateway_name=self.gateway_name,
+            unrealized_pnl=self.unrealized_pnl,
+            realized_pnl=self.realized_pnl,
+            long_value=self.long_value,
+            short_value=self.short_value,
+            margin=self.margin,
+            balance=self.balance,
+            datetime=dt
+        )
+
+
+class PortfolioEngine(BaseEngine):
+    """
+    Provides live mark-to-market pnl and exposure of positions, summed by
+    gateway and for the whole portfolio.
+
+    Each tick, trade, position and account event only updates positions
+    involved and adds their change into sums. Portfolio data of changed
+    sums is published with EVENT_PORTFOLIO at most every interval seconds
+    set by portfolio.interval, where the sum of all gateways has empty
+    gateway_name. Portfolio data is stamped with datetime of the latest
+    tick marking prices, so it follows market data time in replay.
+
+    Not added by default, use main_engine.add_engine(PortfolioEngine).
+    """
+
+    def __init__(self, main_engine: MainEngine, event_engine: EventEngine) -> None:
+        """"""
+        super(PortfolioEngine, self).__init__(main_engine, event_engine, "portfolio")
+
+        self.interval: float = SETTINGS["portfolio.interval"]
+        self.publish_time: float = 0
+        self.datetime: Optional[datetime] = None
+
+        self.positions: Dict[str, PositionPnl] = {}
+        self.symbol_positions: Dict[str, List[PositionPnl]] = {}
+
+        self.portfolios: Dict[str, PortfolioPnl] = {}
+        self.total: PortfolioPnl = PortfolioPnl("")
+        self.changed: Set[str] = set()
+
+        self.balances: Dict[str, float] = {}
+        self.margin_rates: Dict[str, float] = {}
+
+        self.add_function()
+        self.register_event()
+        self.load_data()
+
+    def add_function(self) -> None:
+        """"""
+        self.main_engine.get_portfolio = self.get_portfolio
+
+    def register_event(self) -> None:
+        """"""
+        self.event_engine.register(EVENT_TICK, self.process_tick_event)
+        self.event_engine.register(EVENT_TRADE, self.process_trade_event)
+        self.event_engine.register(EVENT_POSITION, self.process_position_event)
+        self.event_engine.register(EVENT_ACCOUNT, self.process_account_event)
+        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
+
+    def load_data(self) -> None:
+        """
+        Load positions and accounts already in OMS, e.g. restored from
+        snapshot.
+        """
+        for position in self.main_engine.get_all_positions():
+            self.update_position(position)
+
+        for account in self.main_engine.get_all_accounts():
+            self.update_account(account)
+
+    def process_tick_event(self, event: Event) -> None:
+        """"""
+        tick: TickData = event.data
+
+        holders: Optional[List[PositionPnl]] = self.symbol_positions.get(tick.vt_symbol, None)
+        if not holders or not tick.last_price:
+            return
+
+        for holder in holders:
+            old_values: tuple = holder.get_values()
+            holder.last_price = tick.last_price
+            self.update_values(holder, old_values)
+
+        self.datetime = tick.datetime
+        self.check_publish()
+
+    def process_trade_event(self, event: Event) -> None:
+        """
+        Update position with trade, before position data is pushed again
+        by gateway.
+        """
+        trade: TradeData = event.data
+
+        volume: float = trade.volume
+        if trade.direction == Direction.SHORT:
+            volume = -volume
+
+        # Position to update depends on offset, unless in net mode
+        contract: Optional[ContractData] = self.main_engine.get_contract(trade.vt_symbol)
+        if contract:
+            net_position: bool = contract.net_position
+        else:
+            net_position: bool = f"{trade.gateway_name}.{trade.vt_symbol}.{Direction.NET.value}" in self.positions
+
+        if net_position or trade.offset == Offset.NONE:
+            direction: Direction = Direction.NET
+        elif trade.offset == Offset.OPEN:
+            direction: Direction = trade.direction
+        elif trade.direction == Direction.LONG:
+            direction: Direction = Direction.SHORT
+        else:
+            direction: Direction = Direction.LONG
+
+        holder: PositionPnl = self.get_position_pnl(trade.gateway_name, trade.vt_symbol, direction)
+        old_values: tuple = holder.get_values()
+
+        holder.update_trade(trade.price, volume)
+        if not holder.last_price:
+            holder.last_price = trade.price
+
+        self.update_values(holder, old_values)
+        self.check_publish()
+
+    def process_position_event(self, event: Event) -> None:
+        """"""
+        position: PositionData = event.data
+        self.update_position(position)
+        self.check_publish()
+
+    def process_account_event(self, event: Event) -> None:
+        """"""
+        account: AccountData = event.data
+        self.update_account(account)
+        self.check_publish()
+
+    def process_timer_event(self, event: Event) -> None:
+        """"""
+        self.check_publish()
+
+    def update_position(self, position: PositionData) -> None:
+        """
+        Update volume and cost price of position pushed by gateway.
+        """
+        holder: PositionPnl = self.get_position_pnl(position.gateway_name, position.vt_symbol, position.direction)
+        old_values: tuple = holder.get_values()
+
+        if position.direction == Direction.SHORT:
+            holder.volume = -position.volume
+        else:
+            holder.volume = position.volume
+        holder.price = position.price
+
+        if not holder.last_price:
+            tick: Optional[TickData] = self.main_engine.get_tick(position.vt_symbol)
+            holder.last_price = tick.last_price if tick else position.price
+
+        self.update_values(holder, old_values)
+
+    def update_account(self, account: AccountData) -> None:
+        """
+        Update balance of account into its gateway and total.
+        """
+        change: float = account.balance - self.balances.get(account.vt_accountid, 0)
+        self.balances[account.vt_accountid] = account.balance
+
+        self.get_portfolio_pnl(account.gateway_name).balance += change
+        self.total.balance += change
+        self.changed.add(account.gateway_name)
+
+    def update_values(self, holder: PositionPnl, old_values: tuple) -> None:
+        """
+        Recalculate position and add its change into sums.
+        """
+        holder.calculate()
+        new_values: tuple = holder.get_values()
+
+        self.get_portfolio_pnl(holder.gateway_name).update_values(old_values, new_values)
+        self.total.update_values(old_values, new_values)
+        self.changed.add(holder.gateway_name)
+
+    def check_publish(self) -> None:
+        """
+        Publish portfolio data if changed and interval passed.
+        """
+        if not self.changed:
+            return
+
+        now: float = self.event_engine.get_time()
+        if now < self.publish_time:
+            return
+        self.publish_time = now + self.interval
+
+        for gateway_name in self.changed:
+            portfolio: PortfolioData = self.portfolios[gateway_name].to_data(self.datetime)
+            self.event_engine.put(Event(EVENT_PORTFOLIO, portfolio))
+
+        self.event_engine.put(Event(EVENT_PORTFOLIO, self.total.to_data(self.datetime)))
+        self.changed.clear()
+
+    def get_position_pnl(self, gateway_name: str, vt_symbol: str, direction: Direction) -> PositionPnl:
+        """
+        Get pnl of position, created if not exists.
+        """
+        vt_positionid: str = f"{gateway_name}.{vt_symbol}.{direction.value}"
+
+        holder: Optional[PositionPnl] = self.positions.get(vt_positionid, None)
+        if holder:
+            return holder
+
+        contract: Optional[ContractData] = self.main_engine.get_contract(vt_symbol)
+        size: float = contract.size if contract else 1
+
+        holder = PositionPnl(
+            vt_positionid,
+            vt_symbol,
+            gateway_name,
+            size,
+            self.margin_rates.get(vt_symbol, 0)
+        )
+        self.positions[vt_positionid] = holder
+        self.symbol_positions.setdefault(vt_symbol, []).append(holder)
+
+        return holder
+
+    def get_portfolio_pnl(self, gateway_name: str) -> PortfolioPnl:
+        """
+        Get sum of gateway, created if not exists.
+        """
+        portfolio: Optional[PortfolioPnl] = self.portfolios.get(gateway_name, None)
+        if not portfolio:
+            portfolio = PortfolioPnl(gateway_name)
+            self.portfolios[gateway_name] = portfolio
+        return portfolio
+
+    def set_margin_rate(self, vt_symbol: str, margin_rate: float) -> None:
+        """
+        Set margin rate of contract, which is 0 by default, used to
+        calculate margin with notional value of position.
+        """
+        self.margin_rates[vt_symbol] = margin_rate
+
+        for holder in self.symbol_positions.get(vt_symbol, []):
+            old_values: tuple = holder.get_values()
+            holder.margin_rate = margin_rate
+            self.update_values(holder, old_values)
+
+    def get_portfolio(self, gateway_name: str = "") -> PortfolioData:
+        """
+        Get portfolio data of gateway, or of all gateways if gateway_name
+        is empty.
+        """
+        if gateway_name:
+            portfolio: PortfolioPnl = self.get_portfolio_pnl(gateway_name)
+        else:
+            portfolio: PortfolioPnl = self.total
+        return portfolio.to_data(datetime.now())
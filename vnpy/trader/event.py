@@ -12,3 +12,20 @@ EVENT_ACCOUNT = "eAccount."
 EVENT_QUOTE = "eQuote."
 EVENT_CONTRACT = "eContract."
 EVENT_LOG = "eLog"
+EVENT_PORTFOLIO = "ePortfolio."
+EVENT_RECONCILE = "eReconcile"
+
+
+# Default priority lanes of event types used by EventEngine (smaller
+# number means higher priority), other event types use the lowest lane.
+EVENT_PRIORITIES = {
+    EVENT_ORDER: 0,
+    EVENT_TRADE: 0,
+    EVENT_QUOTE: 0,
+    EVENT_POSITION: 1,
+    EVENT_ACCOUNT: 1,
+    EVENT_CONTRACT: 1,
+    EVENT_TICK: 2,
+    EVENT_LOG: 3,
+    EVENT_TIMER: 3,
+}
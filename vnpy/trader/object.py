@@ -2,12 +2,14 @@
 Basic data structure used for general trading function in the trading platform.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import MISSING, dataclass, field, fields, make_dataclass
 from datetime import datetime
 from logging import INFO
-from typing import Optional
+from types import FunctionType
+from typing import Any, Optional, Sequence
 
 from .constant import Direction, Exchange, Interval, Offset, Status, Product, OptionType, OrderType
+from .symbol import generate_vt_symbol
 
 ACTIVE_STATUSES = set([Status.SUBMITTING, Status.NOTTRADED, Status.PARTTRADED])
 
@@ -79,7 +81,7 @@ class TickData(BaseData):
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = generate_vt_symbol(self.symbol, self.exchange)
 
 
 @dataclass
@@ -103,7 +105,7 @@ class BarData(BaseData):
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = generate_vt_symbol(self.symbol, self.exchange)
 
 
 @dataclass
@@ -129,7 +131,7 @@ class OrderData(BaseData):
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = generate_vt_symbol(self.symbol, self.exchange)
         self.vt_orderid: str = f"{self.gateway_name}.{self.orderid}"
 
     def is_active(self) -> bool:
@@ -168,7 +170,7 @@ class TradeData(BaseData):
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = generate_vt_symbol(self.symbol, self.exchange)
         self.vt_orderid: str = f"{self.gateway_name}.{self.orderid}"
         self.vt_tradeid: str = f"{self.gateway_name}.{self.tradeid}"
 
@@ -191,7 +193,7 @@ class PositionData(BaseData):
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = generate_vt_symbol(self.symbol, self.exchange)
         self.vt_positionid: str = f"{self.gateway_name}.{self.vt_symbol}.{self.direction.value}"
 
 
@@ -256,7 +258,7 @@ class ContractData(BaseData):
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = generate_vt_symbol(self.symbol, self.exchange)
 
 
 @dataclass
@@ -282,7 +284,7 @@ class QuoteData(BaseData):
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = generate_vt_symbol(self.symbol, self.exchange)
         self.vt_quoteid: str = f"{self.gateway_name}.{self.quoteid}"
 
     def is_active(self) -> bool:
@@ -301,6 +303,33 @@ class QuoteData(BaseData):
         return req
 
 
+@dataclass
+class PortfolioData(BaseData):
+    """
+    Portfolio data contains mark-to-market pnl and exposure of positions
+    in a gateway, or in all gateways if gateway_name is empty.
+    """
+
+    unrealized_pnl: float = 0
+    realized_pnl: float = 0
+    long_value: float = 0
+    short_value: float = 0
+    margin: float = 0
+    balance: float = 0
+    datetime: datetime = None
+
+    def __post_init__(self) -> None:
+        """"""
+        self.pnl: float = self.unrealized_pnl + self.realized_pnl
+        self.net_value: float = self.long_value - self.short_value
+        self.gross_value: float = self.long_value + self.short_value
+
+        if self.balance:
+            self.margin_ratio: float = self.margin / self.balance
+        else:
+            self.margin_ratio: float = 0
+
+
 @dataclass
 class SubscribeRequest:
     """
@@ -312,7 +341,7 @@ class SubscribeRequest:
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = generate_vt_symbol(self.symbol, self.exchange)
 
 
 @dataclass
@@ -332,7 +361,7 @@ class OrderRequest:
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = generate_vt_symbol(self.symbol, self.exchange)
 
     def create_order_data(self, orderid: str, gateway_name: str) -> OrderData:
         """
@@ -365,7 +394,7 @@ class CancelRequest:
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = generate_vt_symbol(self.symbol, self.exchange)
 
 
 @dataclass
@@ -382,7 +411,7 @@ class HistoryRequest:
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = generate_vt_symbol(self.symbol, self.exchange)
 
 
 @dataclass
@@ -403,7 +432,7 @@ class QuoteRequest:
 
     def __post_init__(self) -> None:
         """"""
-        self.vt_symbol: str = f"{self.symbol}.{self.exchange.value}"
+        self.vt_symbol: str = generate_vt_symbol(self.symbol, self.exchange)
 
     def create_quote_data(self, quoteid: str, gateway_name: str) -> QuoteData:
         """
@@ -423,3 +452,75 @@ class QuoteRequest:
             gateway_name=gateway_name,
         )
         return quote
+
+
+def create_slot_class(data_class: type, attributes: Sequence[str]) -> type:
+    """
+    Create a variant of data class with __slots__ instead of __dict__,
+    which has the same fields, default values and methods, so that it
+    can be used in place of the original class with less memory and
+    faster attribute access.
+
+    Attributes set in __post_init__ (e.g. vt_symbol) should be given,
+    since no other attribute can be set on slotted object.
+
+    Note that the slotted class is not a subclass of the original one.
+    """
+    name: str = f"Slot{data_class.__name__}"
+
+    field_specs: list = []
+    for f in fields(data_class):
+        default: Any = f.default
+        default_factory: Any = f.default_factory
+
+        # Field not in __init__ (e.g. extra) reads default value from class
+        # attribute, which is removed for slots, so it's set by factory
+        # returning the same shared value instead.
+        if not f.init and default is not MISSING:
+            default_factory = (lambda value=default: value)
+            default = MISSING
+
+        field_specs.append((
+            f.name,
+            f.type,
+            field(
+                default=default,
+                default_factory=default_factory,
+                init=f.init,
+                repr=f.repr,
+                hash=f.hash,
+                compare=f.compare,
+                metadata=f.metadata
+            )
+        ))
+
+    # Copy methods defined in data class and its bases
+    namespace: dict = {"__doc__": data_class.__doc__}
+    for base in reversed(data_class.__mro__[:-1]):
+        for key, value in vars(base).items():
+            if isinstance(value, FunctionType) and (not key.startswith("__") or key == "__post_init__"):
+                namespace[key] = value
+
+    cls: type = make_dataclass(name, field_specs, namespace=namespace)
+
+    # Create class again with __slots__, since class attributes of default
+    # values would conflict with slots.
+    class_dict: dict = dict(cls.__dict__)
+    class_dict["__slots__"] = tuple(spec[0] for spec in field_specs) + tuple(attributes)
+
+    for key in class_dict["__slots__"]:
+        class_dict.pop(key, None)
+    class_dict.pop("__dict__", None)
+    class_dict.pop("__weakref__", None)
+
+    slot_class: type = type(name, (), class_dict)
+    slot_class.__module__ = data_class.__module__
+    slot_class.__qualname__ = name
+
+    return slot_class
+
+
+SlotTickData: type = create_slot_class(TickData, ["vt_symbol"])
+SlotBarData: type = create_slot_class(BarData, ["vt_symbol"])
+SlotOrderData: type = create_slot_class(OrderData, ["vt_symbol", "vt_orderid"])
+SlotTradeData: type = create_slot_class(TradeData, ["vt_symbol", "vt_orderid", "vt_tradeid"])
@@ -25,6 +25,15 @@ SETTINGS: Dict[str, Any] = {
     "email.sender": "",
     "email.receiver": "",
 
+    "oms.archive": False,
+    "oms.order_window": 10000,
+    "oms.trade_window": 10000,
+    "oms.snapshot": False,
+    "oms.snapshot_interval": 60,
+    "oms.tick_buffer": 0,
+
+    "portfolio.interval": 1,
+
     "datafeed.name": "",
     "datafeed.username": "",
     "datafeed.password": "",
@@ -0,0 +1,110 @@
+"""
+Snapshot of OMS state saved into local file, for warm restart.
+"""
+
+import os
+import pickle
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from .codec import encode, decode
+
+
+# Version of snapshot file, snapshot of other version is ignored
+SNAPSHOT_VERSION: int = 1
+
+SNAPSHOT_FILENAME: str = "oms_snapshot.dat"
+
+# Volume attributes of position holding in offset converter
+HOLDING_FIELDS: List[str] = [
+    "long_pos",
+    "long_yd",
+    "long_td",
+    "short_pos",
+    "short_yd",
+    "short_td",
+]
+
+
+class SnapshotWriter:
+    """
+    Writes data objects into snapshot file.
+
+    Each object is encoded with binary codec. For sections in
+    cached_sections, the encoded bytes is reused in later writes while
+    the same object is still in snapshot, so that writing thousands of
+    unchanged contracts costs little. Objects of other sections (e.g.
+    positions) may be updated in place, so they are encoded every time.
+    """
+
+    def __init__(self, file_path: Path, cached_sections: Sequence[str] = ("contracts",)) -> None:
+        """"""
+        self.file_path: Path = file_path
+        self.cached_sections: Set[str] = set(cached_sections)
+        self.cache: Dict[int, Tuple[Any, bytes]] = {}
+
+    def write(self, sections: Dict[str, Sequence[Any]], holdings: List[tuple]) -> None:
+        """
+        Write sections of data objects and holdings of offset converter.
+
+        File is replaced atomically, so a crash during writing never
+        leaves a broken snapshot.
+        """
+        cache: Dict[int, Tuple[Any, bytes]] = {}
+
+        content: Dict[str, Any] = {
+            "version": SNAPSHOT_VERSION,
+            "datetime": datetime.now(),
+            "holdings": holdings
+        }
+
+        for name, objects in sections.items():
+            if name not in self.cached_sections:
+                content[name] = [encode(obj) for obj in objects]
+                continue
+
+            data: List[bytes] = []
+
+            for obj in objects:
+                key: int = id(obj)
+
+                # Cache keeps object alive, so id is never reused
+                cached: Optional[Tuple[Any, bytes]] = self.cache.get(key, None)
+                if cached is None or cached[0] is not obj:
+                    cached = (obj, encode(obj))
+
+                cache[key] = cached
+                data.append(cached[1])
+
+            content[name] = data
+
+        # Objects no longer in snapshot are dropped from cache
+        self.cache = cache
+
+        temp_path: Path = self.file_path.with_suffix(".tmp")
+        with open(temp_path, "wb") as f:
+            pickle.dump(content, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.file_path)
+
+
+def read_snapshot(file_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Read snapshot file with data objects decoded, return None if file not
+    found or of different version.
+    """
+    if not file_path.exists():
+        return None
+
+    with open(file_path, "rb") as f:
+        content: Dict[str, Any] = pickle.load(f)
+
+    if content.get("version", None) != SNAPSHOT_VERSION:
+        return None
+
+    for name, value in content.items():
+        if name in {"version", "datetime", "holdings"}:
+            continue
+        content[name] = [decode(data) for data in value]
+
+    return content
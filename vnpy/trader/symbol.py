@@ -0,0 +1,103 @@
+"""
+Process-wide registry of symbols with interned vt_symbol and integer id.
+"""
+
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .constant import Exchange
+
+
+class SymbolRegistry:
+    """
+    Assigns each (symbol, exchange) a compact integer id in order of
+    registration, starting from 0, so that per-symbol data can be kept
+    in lists or arrays indexed by id.
+
+    The vt_symbol string of each symbol is created only once and shared,
+    so converting between vt_symbol and (symbol, exchange) is a dict
+    lookup rather than string formatting or splitting.
+
+    Symbols are registered on first use and never removed. Lookups are
+    lock-free, while registration is protected by lock.
+    """
+
+    def __init__(self) -> None:
+        """"""
+        self.vt_symbols: List[str] = []
+        self.keys: List[Tuple[str, Exchange]] = []
+
+        self.ids: Dict[str, int] = {}
+        self.vt_symbol_map: Dict[Exchange, Dict[str, str]] = {}
+
+        self.lock: Lock = Lock()
+
+    def register(self, symbol: str, exchange: Exchange) -> int:
+        """
+        Register symbol and return its id.
+        """
+        vt_symbol: str = f"{symbol}.{exchange.value}"
+
+        with self.lock:
+            symbol_id: Optional[int] = self.ids.get(vt_symbol, None)
+            if symbol_id is not None:
+                return symbol_id
+
+            symbol_id = len(self.vt_symbols)
+            self.vt_symbols.append(vt_symbol)
+            self.keys.append((symbol, exchange))
+
+            # Publish into maps only after lists are filled
+            self.vt_symbol_map.setdefault(exchange, {})[symbol] = vt_symbol
+            self.ids[vt_symbol] = symbol_id
+
+        return symbol_id
+
+    def generate_vt_symbol(self, symbol: str, exchange: Exchange) -> str:
+        """
+        Get interned vt_symbol of symbol and exchange.
+        """
+        try:
+            return self.vt_symbol_map[exchange][symbol]
+        except KeyError:
+            return self.vt_symbols[self.register(symbol, exchange)]
+
+    def extract_vt_symbol(self, vt_symbol: str) -> Tuple[str, Exchange]:
+        """
+        Get (symbol, exchange) of vt_symbol.
+        """
+        try:
+            return self.keys[self.ids[vt_symbol]]
+        except KeyError:
+            symbol, exchange_str = vt_symbol.rsplit(".", 1)
+            return self.keys[self.register(symbol, Exchange(exchange_str))]
+
+    def get_id(self, vt_symbol: str) -> int:
+        """
+        Get id of vt_symbol, registered if not yet.
+        """
+        try:
+            return self.ids[vt_symbol]
+        except KeyError:
+            symbol, exchange_str = vt_symbol.rsplit(".", 1)
+            return self.register(symbol, Exchange(exchange_str))
+
+    def get_vt_symbol(self, symbol_id: int) -> str:
+        """
+        Get vt_symbol of id.
+        """
+        return self.vt_symbols[symbol_id]
+
+    def get_count(self) -> int:
+        """
+        Get number of symbols registered, which is also the upper bound
+        of ids.
+        """
+        return len(self.vt_symbols)
+
+
+symbol_registry: SymbolRegistry = SymbolRegistry()
+
+# Shortcuts of process-wide registry, bound directly to save a call
+generate_vt_symbol: Callable[[str, Exchange], str] = symbol_registry.generate_vt_symbol
+get_symbol_id: Callable[[str], int] = symbol_registry.get_id
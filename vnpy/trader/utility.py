@@ -15,6 +15,8 @@ import numpy as np
 import talib
 
 from .object import BarData, TickData
+from .batch import BarBatch
+from .symbol import symbol_registry
 from .constant import Exchange, Interval
 from .locale import _
 
@@ -30,16 +32,19 @@ log_formatter: logging.Formatter = logging.Formatter("[%(asctime)s] %(message)s"
 def extract_vt_symbol(vt_symbol: str) -> Tuple[str, Exchange]:
     """
     :return: (symbol, exchange)
+
+    Cached in process-wide symbol registry.
     """
-    symbol, exchange_str = vt_symbol.rsplit(".", 1)
-    return symbol, Exchange(exchange_str)
+    return symbol_registry.extract_vt_symbol(vt_symbol)
 
 
 def generate_vt_symbol(symbol: str, exchange: Exchange) -> str:
     """
     return vt_symbol
+
+    Interned in process-wide symbol registry.
     """
-    return f"{symbol}.{exchange.value}"
+    return symbol_registry.generate_vt_symbol(symbol, exchange)
 
 
 def _get_trader_dir(temp_name: str) -> Tuple[Path, Path]:
@@ -529,6 +534,34 @@ class ArrayManager(object):
         self.turnover_array[-1] = bar.turnover
         self.open_interest_array[-1] = bar.open_interest
 
+    def update_batch(self, batch: BarBatch) -> None:
+        """
+        Update bar data in batch into array manager, same as calling
+        update_bar for each bar but vectorized.
+        """
+        count: int = len(batch)
+        if not count:
+            return
+
+        self.count += count
+        if not self.inited and self.count >= self.size:
+            self.inited = True
+
+        n: int = min(count, self.size)
+        data: np.ndarray = batch.data[-n:]
+
+        for array, name in [
+            (self.open_array, "open_price"),
+            (self.high_array, "high_price"),
+            (self.low_array, "low_price"),
+            (self.close_array, "close_price"),
+            (self.volume_array, "volume"),
+            (self.turnover_array, "turnover"),
+            (self.open_interest_array, "open_interest"),
+        ]:
+            array[:-n] = array[n:]
+            array[-n:] = data[name]
+
     @property
     def open(self) -> np.ndarray:
         """